@@ -1,20 +1,40 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import sys
-from typing import List, Optional, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from config import AppConfig, TaskConfig, load_app_config
 from config_utils import parse_keywords
-from core import (
-    RunRequest,
-    create_session,
-    fetch_search,
-    parse_courses_from_html,
-    run_once,
-)
 from privacy import mask_identifier, sanitize_text
-from runner import TaskOverrides, run_tasks
+
+# core/runner 会连带导入 requests、HTML 解析等重量级依赖，仅在对应子命令中按需导入
+if TYPE_CHECKING:
+    from runner import TaskOverrides
+
+
+@dataclass(slots=True)
+class CliArgs:
+    command: Optional[str] = None
+    compat_date: Optional[str] = None
+    compat_shop: Optional[str] = None
+    compat_show: bool = False
+    compat_title: Optional[List[str]] = None
+    compat_time: Optional[List[str]] = None
+    date: Optional[str] = None
+    shop: Optional[str] = None
+    title: Optional[List[str]] = None
+    time: Optional[List[str]] = None
+    cookie: Optional[str] = None
+    strict_match: Optional[bool] = None
+    allow_fallback: Optional[bool] = None
+    max_attempts: Optional[int] = None
+    delay_ms: Optional[List[int]] = None
+    concurrency: Optional[int] = None
+    global_timeout_ms: Optional[int] = None
+    log_json: Optional[bool] = None
 
 
 def _parse_keywords(values: Optional[Sequence[str]]) -> List[str]:
@@ -30,17 +50,7 @@ def _parse_keywords(values: Optional[Sequence[str]]) -> List[str]:
     return result
 
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="预约任务自动化 CLI（示例数据）")
-    parser.add_argument("--date", dest="compat_date")
-    parser.add_argument("--shop", dest="compat_shop")
-    parser.add_argument("--show", dest="compat_show", action="store_true")
-    parser.add_argument("--title", dest="compat_title", action="append")
-    parser.add_argument("--time", dest="compat_time", action="append")
-
-    subparsers = parser.add_subparsers(dest="command")
-
-    run_parser = subparsers.add_parser("run-tasks", help="执行多账号多任务预约")
+def _build_run_tasks_parser(run_parser: argparse.ArgumentParser) -> None:
     run_parser.add_argument("--date")
     run_parser.add_argument("--shop")
     run_parser.add_argument("--title", action="append")
@@ -59,7 +69,8 @@ def build_parser() -> argparse.ArgumentParser:
     run_parser.add_argument("--no-log-json", dest="log_json", action="store_false")
     run_parser.set_defaults(log_json=None)
 
-    reserve_parser = subparsers.add_parser("reserve", help="单次直约入口")
+
+def _build_reserve_parser(reserve_parser: argparse.ArgumentParser) -> None:
     reserve_parser.add_argument("--date", required=True)
     reserve_parser.add_argument("--shop")
     reserve_parser.add_argument("--title", action="append")
@@ -72,51 +83,110 @@ def build_parser() -> argparse.ArgumentParser:
     reserve_parser.add_argument("--disallow-fallback", dest="allow_fallback", action="store_false")
     reserve_parser.set_defaults(allow_fallback=None)
 
-    show_parser = subparsers.add_parser("show-courses", help="仅展示课程列表")
+
+def _build_show_parser(show_parser: argparse.ArgumentParser) -> None:
     show_parser.add_argument("--date", required=True)
     show_parser.add_argument("--shop")
     show_parser.add_argument("--cookie")
 
+
+# 子命令 -> (帮助文本, 参数构建函数)；仅在实际选中时才构建完整参数
+_SUBCOMMANDS: Dict[str, Tuple[str, Callable[[argparse.ArgumentParser], None]]] = {
+    "run-tasks": ("执行多账号多任务预约", _build_run_tasks_parser),
+    "reserve": ("单次直约入口", _build_reserve_parser),
+    "show-courses": ("仅展示课程列表", _build_show_parser),
+}
+
+
+# 根解析器上需要取值的兼容参数，预扫描时跳过其后的取值
+_ROOT_VALUE_OPTIONS = frozenset({"--date", "--shop", "--title", "--time"})
+
+
+def _detect_command(argv: Sequence[str]) -> Optional[str]:
+    tokens = iter(argv)
+    for token in tokens:
+        if token == "--":
+            break
+        if token in _ROOT_VALUE_OPTIONS:
+            next(tokens, None)
+            continue
+        if token in _SUBCOMMANDS:
+            return token
+    return None
+
+
+def build_parser(commands: Optional[Iterable[str]] = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="预约任务自动化 CLI（示例数据）")
+    parser.add_argument("--date", dest="compat_date")
+    parser.add_argument("--shop", dest="compat_shop")
+    parser.add_argument("--show", dest="compat_show", action="store_true")
+    parser.add_argument("--title", dest="compat_title", action="append")
+    parser.add_argument("--time", dest="compat_time", action="append")
+
+    subparsers = parser.add_subparsers(dest="command")
+    # commands 为 None 时构建全部子命令；其余子命令只注册帮助文本占位
+    selected = set(_SUBCOMMANDS) if commands is None else set(commands)
+    for name, (help_text, builder) in _SUBCOMMANDS.items():
+        sub_parser = subparsers.add_parser(name, help=help_text)
+        if name in selected:
+            builder(sub_parser)
+
     return parser
 
 
-def _apply_cli_overrides(args: argparse.Namespace) -> dict:
+# 作为库反复调用 main() 时复用已构建的解析器；可通过 _get_parser.cache_clear() 重置
+@functools.lru_cache(maxsize=None)
+def _get_parser(command: Optional[str]) -> argparse.ArgumentParser:
+    return build_parser([command] if command else [])
+
+
+def _apply_cli_overrides(args: CliArgs) -> dict:
     overrides = {}
-    if getattr(args, "shop", None):
-        overrides["SHOP_ID"] = args.shop
-    if getattr(args, "concurrency", None) is not None:
-        overrides["CONCURRENCY"] = args.concurrency
-    if getattr(args, "global_timeout_ms", None) is not None:
-        overrides["GLOBAL_TIMEOUT_MS"] = args.global_timeout_ms
-    if getattr(args, "log_json", None) is not None:
-        overrides["LOG_JSON"] = args.log_json
+    shop = args.shop
+    if shop:
+        overrides["SHOP_ID"] = shop
+    concurrency = args.concurrency
+    if concurrency is not None:
+        overrides["CONCURRENCY"] = concurrency
+    global_timeout_ms = args.global_timeout_ms
+    if global_timeout_ms is not None:
+        overrides["GLOBAL_TIMEOUT_MS"] = global_timeout_ms
+    log_json = args.log_json
+    if log_json is not None:
+        overrides["LOG_JSON"] = log_json
     return overrides
 
 
-def _build_task_overrides(args: argparse.Namespace) -> TaskOverrides:
-    titles = _parse_keywords(getattr(args, "title", None))
-    times = _parse_keywords(getattr(args, "time", None))
+def _build_task_overrides(args: CliArgs) -> TaskOverrides:
+    from runner import TaskOverrides
+
+    titles = _parse_keywords(args.title)
+    times = _parse_keywords(args.time)
     overrides = TaskOverrides()
-    if getattr(args, "date", None):
-        overrides.date = args.date
+    date = args.date
+    if date:
+        overrides.date = date
     if titles:
         overrides.title_keywords = titles
     if times:
         overrides.time_keywords = times
-    if getattr(args, "strict_match", None) is not None:
-        overrides.strict_match = args.strict_match
-    if getattr(args, "allow_fallback", None) is not None:
-        overrides.allow_fallback = args.allow_fallback
-    if getattr(args, "max_attempts", None) is not None:
-        overrides.max_attempts = args.max_attempts
-    if getattr(args, "delay_ms", None) is not None:
-        delay = getattr(args, "delay_ms")
+    strict_match = args.strict_match
+    if strict_match is not None:
+        overrides.strict_match = strict_match
+    allow_fallback = args.allow_fallback
+    if allow_fallback is not None:
+        overrides.allow_fallback = allow_fallback
+    max_attempts = args.max_attempts
+    if max_attempts is not None:
+        overrides.max_attempts = max_attempts
+    delay = args.delay_ms
+    if delay is not None:
         overrides.delay_ms = (int(delay[0]), int(delay[1]))
     return overrides
 
 
-def _resolve_cookie(args: argparse.Namespace, config: AppConfig) -> Optional[str]:
-    if getattr(args, "cookie", None):
+def _resolve_cookie(args: CliArgs, config: AppConfig) -> Optional[str]:
+    if args.cookie:
         return args.cookie
     if config.accounts:
         return config.accounts[0].cookie
@@ -129,16 +199,16 @@ def _resolve_keywords_from_config(config: AppConfig) -> TaskConfig:
     return TaskConfig()
 
 
-def _handle_run_tasks(args: argparse.Namespace) -> int:
+def _handle_run_tasks(args: CliArgs) -> int:
+    from runner import run_tasks
+
     cli_overrides = _apply_cli_overrides(args)
-    if getattr(args, "shop", None):
-        cli_overrides["SHOP_ID"] = args.shop
     config = load_app_config(cli_overrides)
     task_overrides = _build_task_overrides(args)
     records = run_tasks(
         config,
         overrides=task_overrides,
-        shop_id_override=getattr(args, "shop", None),
+        shop_id_override=args.shop,
     )
     if not records:
         print("未发现可执行的任务，请检查 ACCOUNTS/TASKS 配置。")
@@ -147,9 +217,11 @@ def _handle_run_tasks(args: argparse.Namespace) -> int:
     return 0 if success else 1
 
 
-def _handle_reserve(args: argparse.Namespace) -> int:
+def _handle_reserve(args: CliArgs) -> int:
+    from core import RunRequest, run_once
+
     cli_overrides = {}
-    if getattr(args, "shop", None):
+    if args.shop:
         cli_overrides["SHOP_ID"] = args.shop
     config = load_app_config(cli_overrides)
     cookie = _resolve_cookie(args, config)
@@ -159,8 +231,8 @@ def _handle_reserve(args: argparse.Namespace) -> int:
     shop_id = args.shop or config.shop_id
     masked_shop = mask_identifier(shop_id, placeholder="SHOP")
     print(sanitize_text(f"[配置] 使用 shop_id = {masked_shop}"))
-    titles = _parse_keywords(getattr(args, "title", None))
-    times = _parse_keywords(getattr(args, "time", None))
+    titles = _parse_keywords(args.title)
+    times = _parse_keywords(args.time)
     base_task = _resolve_keywords_from_config(config)
     strict_match = (
         args.strict_match if args.strict_match is not None else base_task.strict_match
@@ -203,9 +275,11 @@ def _handle_reserve(args: argparse.Namespace) -> int:
     return 0 if outcome.success else 1
 
 
-def _handle_show(args: argparse.Namespace) -> int:
+def _handle_show(args: CliArgs) -> int:
+    from core import create_session, fetch_search, parse_courses_from_html
+
     cli_overrides = {}
-    if getattr(args, "shop", None):
+    if args.shop:
         cli_overrides["SHOP_ID"] = args.shop
     config = load_app_config(cli_overrides)
     cookie = _resolve_cookie(args, config)
@@ -229,15 +303,23 @@ def _handle_show(args: argparse.Namespace) -> int:
     for course in courses:
         print(
             sanitize_text(
-                f"- {course['title']} | {course['time']} | {course['taken']}/{course['total']} | {course['status']} | {course['href']}"
+                f"- {course.title} | {course.time} | {course.taken}/{course.total} | {course.status} | {course.href}"
             )
         )
     return 0
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+    if argv is None:
+        argv = sys.argv[1:]
+    command = _detect_command(argv)
+    parser = _get_parser(command)
+    namespace, extras = parser.parse_known_args(argv)
+    if extras or namespace.command != command:
+        # 预扫描判断有误（如缩写参数吞掉了子命令名）时，用完整解析器重新解析
+        parser = build_parser()
+        namespace = parser.parse_args(argv)
+    args = CliArgs(**vars(namespace))
 
     if args.command == "run-tasks":
         return _handle_run_tasks(args)
@@ -247,28 +329,20 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         return _handle_show(args)
 
     # 兼容旧参数：--show 表示展示课程
-    if getattr(args, "compat_show", False):
+    if args.compat_show:
         if not args.compat_date:
             parser.error("--show 需要同时提供 --date")
-        compat_args = argparse.Namespace(
-            date=args.compat_date,
-            shop=args.compat_shop,
-            cookie=None,
-        )
-        return _handle_show(compat_args)
+        args.date = args.compat_date
+        args.shop = args.compat_shop
+        return _handle_show(args)
 
     # 没有子命令但传入了 date/shop -> 默认执行 reserve
     if args.compat_date:
-        reserve_args = argparse.Namespace(
-            date=args.compat_date,
-            shop=args.compat_shop,
-            title=args.compat_title,
-            time=args.compat_time,
-            cookie=None,
-            strict_match=None,
-            allow_fallback=None,
-        )
-        return _handle_reserve(reserve_args)
+        args.date = args.compat_date
+        args.shop = args.compat_shop
+        args.title = args.compat_title
+        args.time = args.compat_time
+        return _handle_reserve(args)
 
     parser.print_help()
     return 0
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
+import functools
 import json
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
+from config_utils import parse_delay
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class AccountConfig:
     name: str
     cookie: str
     preferred_cards: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TaskConfig:
     title_keywords: List[str] = field(default_factory=list)
     time_keywords: List[str] = field(default_factory=list)
@@ -25,7 +28,7 @@ class TaskConfig:
     delay_ms: Tuple[int, int] = (120, 300)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppConfig:
     shop_id: str
     accounts: List[AccountConfig] = field(default_factory=list)
@@ -36,18 +39,32 @@ class AppConfig:
     log_json: bool = False
 
 
+def _env_file_signature(path: str) -> Tuple[int, int]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (0, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_ENV_FILE_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+
 def _load_env_file(path: str) -> Dict[str, str]:
-    env_path = Path(path)
-    if not env_path.exists():
+    signature = _env_file_signature(path)
+    if signature[1] < 0:
         return {}
+    cached = _ENV_FILE_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
     data: Dict[str, str] = {}
-    for raw in env_path.read_text(encoding="utf-8").splitlines():
+    for raw in Path(path).read_text(encoding="utf-8").splitlines():
         line = raw.strip()
         if not line or line.startswith("#"):
             continue
-        if "=" not in line:
+        key, sep, value = line.partition("=")
+        if not sep:
             continue
-        key, value = line.split("=", 1)
         key = key.strip()
         value = value.strip()
         if (value.startswith('"') and value.endswith('"')) or (
@@ -55,6 +72,7 @@ def _load_env_file(path: str) -> Dict[str, str]:
         ):
             value = value[1:-1]
         data[key] = value
+    _ENV_FILE_CACHE[path] = (signature, data)
     return data
 
 
@@ -64,24 +82,27 @@ def _merge_sources(
     env_vars: Mapping[str, str],
     cli_overrides: Optional[Mapping[str, Any]],
 ) -> Dict[str, Any]:
+    # 只有 defaults 中声明的键会被读取，其余环境变量无需复制
+    relevant = defaults.keys()
     merged: Dict[str, Any] = dict(defaults)
     for source in (env_file, env_vars, cli_overrides or {}):
-        for key, value in source.items():
-            if value is None:
-                continue
-            merged[key] = value
+        merged.update(
+            {key: value for key, value in source.items() if key in relevant and value is not None}
+        )
     return merged
 
 
+_TRUE_STRINGS = frozenset({"1", "true", "yes", "on"})
+
+
 def _to_bool(value: Any) -> bool:
-    if isinstance(value, bool):
+    if value is True or value is False:
         return value
     if value is None:
         return False
     if isinstance(value, (int, float)):
         return bool(value)
-    value_str = str(value).strip().lower()
-    return value_str in {"1", "true", "yes", "on"}
+    return str(value).strip().lower() in _TRUE_STRINGS
 
 
 def _to_int(value: Any) -> Optional[int]:
@@ -118,6 +139,8 @@ def _normalise_keywords(value: Any) -> List[str]:
     if isinstance(value, str):
         if not value.strip():
             return []
+        if "[" not in value:
+            return [value]
         try:
             parsed = json.loads(value)
         except json.JSONDecodeError:
@@ -127,55 +150,58 @@ def _normalise_keywords(value: Any) -> List[str]:
     return [str(value)]
 
 
-def _parse_accounts(data: Any) -> List[AccountConfig]:
+def _build_accounts(data: Any) -> List[AccountConfig]:
     accounts_raw = _to_list(data)
     accounts: List[AccountConfig] = []
     for idx, item in enumerate(accounts_raw):
-        if not isinstance(item, MutableMapping):
+        # json.loads 只会产出 dict，先做精确类型判断，其余映射类型再走 isinstance
+        if type(item) is not dict and not isinstance(item, MutableMapping):
             raise ValueError(f"ACCOUNTS[{idx}] 不是对象：{item!r}")
-        name = str(item.get("name") or f"account-{idx+1}")
-        cookie = str(item.get("cookie") or "")
+        cookie = item.get("cookie")
         if not cookie:
             raise ValueError(f"ACCOUNTS[{idx}] 缺少 cookie")
-        preferred_cards = _normalise_keywords(item.get("preferred_cards"))
-        accounts.append(AccountConfig(name=name, cookie=cookie, preferred_cards=preferred_cards))
+        name = item.get("name") or f"account-{idx+1}"
+        accounts.append(
+            AccountConfig(str(name), str(cookie), _normalise_keywords(item.get("preferred_cards")))
+        )
     return accounts
 
 
+_DEFAULT_DELAY_MS: Tuple[int, int] = (120, 300)
+
+
+def _to_attempts(value: Any) -> int:
+    return max(1, int(value or 1))
+
+
+def _to_delay(value: Any) -> Tuple[int, int]:
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return (int(value[0]), int(value[1]))
+    if isinstance(value, str):
+        return parse_delay(value) or _DEFAULT_DELAY_MS
+    return _DEFAULT_DELAY_MS
+
+
+# (字段名, 转换函数, 缺省值)
+_TASK_FIELDS: Tuple[Tuple[str, Callable[[Any], Any], Any], ...] = (
+    ("title_keywords", _normalise_keywords, None),
+    ("time_keywords", _normalise_keywords, None),
+    ("strict_match", bool, True),
+    ("allow_fallback", bool, True),
+    ("max_attempts", _to_attempts, 1),
+    ("delay_ms", _to_delay, None),
+)
+
+
 def _parse_task(item: MutableMapping[str, Any]) -> TaskConfig:
-    title_keywords = _normalise_keywords(item.get("title_keywords"))
-    time_keywords = _normalise_keywords(item.get("time_keywords"))
+    kwargs: Dict[str, Any] = {
+        name: convert(item.get(name, default)) for name, convert, default in _TASK_FIELDS
+    }
     date = item.get("date")
-    strict_match = bool(item.get("strict_match", True))
-    allow_fallback = bool(item.get("allow_fallback", True))
-    max_attempts = int(item.get("max_attempts", 1) or 1)
-    delay_val = item.get("delay_ms")
-    delay: Tuple[int, int]
-    if isinstance(delay_val, (list, tuple)) and len(delay_val) == 2:
-        delay = (int(delay_val[0]), int(delay_val[1]))
-    elif isinstance(delay_val, str) and delay_val:
-        try:
-            parsed = json.loads(delay_val)
-        except json.JSONDecodeError as exc:
-            raise ValueError(f"TASKS.delay_ms JSON 解析失败: {exc}") from exc
-        if isinstance(parsed, list) and len(parsed) == 2:
-            delay = (int(parsed[0]), int(parsed[1]))
-        else:
-            raise ValueError("delay_ms 需要长度为 2 的数组")
-    else:
-        delay = (120, 300)
-    return TaskConfig(
-        title_keywords=title_keywords,
-        time_keywords=time_keywords,
-        date=str(date) if date else None,
-        strict_match=strict_match,
-        allow_fallback=allow_fallback,
-        max_attempts=max(1, max_attempts),
-        delay_ms=delay,
-    )
+    return TaskConfig(date=str(date) if date else None, **kwargs)
 
 
-def _parse_tasks(data: Any) -> List[TaskConfig]:
+def _build_tasks(data: Any) -> List[TaskConfig]:
     tasks_raw = _to_list(data)
     tasks: List[TaskConfig] = []
     for idx, item in enumerate(tasks_raw):
@@ -185,11 +211,82 @@ def _parse_tasks(data: Any) -> List[TaskConfig]:
     return tasks
 
 
-def load_app_config(
-    cli_overrides: Optional[Mapping[str, Any]] = None,
-    *,
-    env: Optional[Mapping[str, str]] = None,
-    env_path: str = ".env",
+# ACCOUNTS/TASKS 多以 JSON 字符串传入，按原始字符串缓存解析结果；
+# 命中后复制列表字段，避免调用方修改影响缓存。
+@functools.lru_cache(maxsize=32)
+def _parse_accounts_json(raw: str) -> Tuple[AccountConfig, ...]:
+    return tuple(_build_accounts(raw))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_tasks_json(raw: str) -> Tuple[TaskConfig, ...]:
+    return tuple(_build_tasks(raw))
+
+
+def _copy_accounts(accounts: Sequence[AccountConfig]) -> List[AccountConfig]:
+    return [replace(account, preferred_cards=list(account.preferred_cards)) for account in accounts]
+
+
+def _copy_tasks(tasks: Sequence[TaskConfig]) -> List[TaskConfig]:
+    return [
+        replace(
+            task,
+            title_keywords=list(task.title_keywords),
+            time_keywords=list(task.time_keywords),
+        )
+        for task in tasks
+    ]
+
+
+def _parse_accounts(data: Any) -> List[AccountConfig]:
+    if not isinstance(data, str):
+        return _build_accounts(data)
+    return _copy_accounts(_parse_accounts_json(data))
+
+
+def _parse_tasks(data: Any) -> List[TaskConfig]:
+    if not isinstance(data, str):
+        return _build_tasks(data)
+    return _copy_tasks(_parse_tasks_json(data))
+
+
+_CONFIG_KEYS: Tuple[str, ...] = (
+    "SHOP_ID",
+    "ACCOUNTS",
+    "TASKS",
+    "DATE_RULE",
+    "GLOBAL_TIMEOUT_MS",
+    "CONCURRENCY",
+    "LOG_JSON",
+)
+# 以 (.env 路径/mtime/size, 相关环境变量, CLI 覆盖项) 为键缓存解析结果；
+# 每次返回的都是列表字段独立的副本，调用方修改不会影响缓存。
+_CONFIG_CACHE_SIZE = 32
+_CONFIG_CACHE: Dict[Tuple[Any, ...], AppConfig] = {}
+
+
+def _config_cache_key(
+    cli_overrides: Optional[Mapping[str, Any]],
+    env: Mapping[str, str],
+    env_path: str,
+) -> Optional[Tuple[Any, ...]]:
+    key = (
+        env_path,
+        _env_file_signature(env_path),
+        tuple(env.get(name) for name in _CONFIG_KEYS),
+        tuple(sorted((cli_overrides or {}).items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _build_app_config(
+    cli_overrides: Optional[Mapping[str, Any]],
+    env: Mapping[str, str],
+    env_path: str,
 ) -> AppConfig:
     defaults: Dict[str, Any] = {
         "SHOP_ID": "SHOP_0001",
@@ -201,7 +298,9 @@ def load_app_config(
         "LOG_JSON": False,
     }
     env_values = _load_env_file(env_path)
-    merged = _merge_sources(defaults, env_values, env or os.environ, cli_overrides)
+    # 仅取出已知配置键，避免遍历整个进程环境变量
+    env_view = {key: env[key] for key in _CONFIG_KEYS if key in env}
+    merged = _merge_sources(defaults, env_values, env_view, cli_overrides)
 
     shop_id = str(merged.get("SHOP_ID") or defaults["SHOP_ID"])
     accounts = _parse_accounts(merged.get("ACCOUNTS")) if merged.get("ACCOUNTS") else []
@@ -224,3 +323,42 @@ def load_app_config(
         concurrency=max(1, concurrency),
         log_json=log_json,
     )
+
+
+def load_app_config(
+    cli_overrides: Optional[Mapping[str, Any]] = None,
+    *,
+    env: Optional[Mapping[str, str]] = None,
+    env_path: str = ".env",
+) -> AppConfig:
+    env_source = env or os.environ
+    key = _config_cache_key(cli_overrides, env_source, env_path)
+    if key is not None:
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None:
+            return _copy_config(cached)
+    config = _build_app_config(cli_overrides, env_source, env_path)
+    if key is not None:
+        if len(_CONFIG_CACHE) >= _CONFIG_CACHE_SIZE:
+            _CONFIG_CACHE.pop(next(iter(_CONFIG_CACHE)))
+        _CONFIG_CACHE[key] = config
+        return _copy_config(config)
+    return config
+
+
+def _copy_config(config: AppConfig) -> AppConfig:
+    return replace(
+        config,
+        accounts=_copy_accounts(config.accounts),
+        tasks=_copy_tasks(config.tasks),
+    )
+
+
+def _clear_config_caches() -> None:
+    _CONFIG_CACHE.clear()
+    _ENV_FILE_CACHE.clear()
+    _parse_accounts_json.cache_clear()
+    _parse_tasks_json.cache_clear()
+
+
+load_app_config.cache_clear = _clear_config_caches  # type: ignore[attr-defined]
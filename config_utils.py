@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 import json
+import re
 from collections.abc import Iterable
 from datetime import date, datetime, timedelta
 from typing import List, Optional, Tuple
 
+_KEYWORD_SEP_TABLE = str.maketrans({"|": ",", ";": ",", "\n": ","})
+_DELAY_SPLIT = re.compile(r"[|,;\s]")
+_DATE_SPLIT = re.compile(r"[|,;\n]")
+_KEYWORD_SPECIAL = frozenset("[|,;\n")
+
 
 def parse_keywords(value: Optional[str]) -> List[str]:
     """Parse a delimiter-separated keyword string into a list."""
@@ -15,6 +21,8 @@ def parse_keywords(value: Optional[str]) -> List[str]:
     raw = value.strip()
     if not raw:
         return []
+    if _KEYWORD_SPECIAL.isdisjoint(raw):
+        return [raw]
     if raw.startswith("["):
         try:
             parsed = json.loads(raw)
@@ -22,10 +30,10 @@ def parse_keywords(value: Optional[str]) -> List[str]:
             parsed = None
         if isinstance(parsed, Iterable) and not isinstance(parsed, (str, bytes)):
             return [str(item).strip() for item in parsed if str(item).strip()]
-    for sep in ("|", ",", "\n", ";"):
-        if sep in raw:
-            return [part.strip() for part in raw.split(sep) if part.strip()]
-    return [raw]
+    parts = raw.translate(_KEYWORD_SEP_TABLE).split(",")
+    if len(parts) == 1:
+        return [raw]
+    return [part.strip() for part in parts if part.strip()]
 
 
 def parse_bool(value: Optional[str], default: bool) -> bool:
@@ -55,14 +63,47 @@ def parse_delay(value: Optional[str]) -> Optional[Tuple[int, int]]:
         if isinstance(parsed, (list, tuple)) and len(parsed) == 2:
             return int(parsed[0]), int(parsed[1])
         raise ValueError("delay_ms 需要长度为 2 的数组")
-    for sep in ("|", ",", ";", " "):
-        if sep in raw:
-            parts = [part for part in raw.split(sep) if part.strip()]
-            if len(parts) == 2:
-                return int(parts[0]), int(parts[1])
+    parts = [part for part in _DELAY_SPLIT.split(raw) if part]
+    if len(parts) == 2:
+        return int(parts[0]), int(parts[1])
     raise ValueError("delay_ms 需要形如 '120,300' 的两个整数")
 
 
+def _parse_single_date(date_str: str) -> date:
+    try:
+        # 标准 YYYY-MM-DD 直接切片构造；其余写法（如 2024-1-5）交给 strptime，接受范围与之一致
+        if (
+            len(date_str) == 10
+            and date_str.isascii()
+            and date_str[4] == "-"
+            and date_str[7] == "-"
+            and date_str[:4].isdigit()
+            and date_str[5:7].isdigit()
+            and date_str[8:].isdigit()
+        ):
+            return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]))
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError as exc:  # pragma: no cover - defensive branch
+        raise ValueError(f"无法解析日期: {date_str}") from exc
+
+
+def _expand_date_token(token: str) -> List[date]:
+    token = token.strip()
+    if not token:
+        return []
+    if "~" in token:
+        start_raw, end_raw = [part.strip() for part in token.split("~", 1)]
+        if not start_raw or not end_raw:
+            raise ValueError(f"日期范围格式错误: {token}")
+        start = _parse_single_date(start_raw)
+        end = _parse_single_date(end_raw)
+        if end < start:
+            start, end = end, start
+        span = (end - start).days + 1
+        return [start + timedelta(days=offset) for offset in range(span)]
+    return [_parse_single_date(token)]
+
+
 def parse_date_list(value: Optional[str]) -> List[str]:
     if value is None:
         return []
@@ -70,32 +111,6 @@ def parse_date_list(value: Optional[str]) -> List[str]:
     if not raw:
         return []
 
-    def _parse_single(date_str: str) -> date:
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError as exc:  # pragma: no cover - defensive branch
-            raise ValueError(f"无法解析日期: {date_str}") from exc
-
-    def _expand(token: str) -> List[date]:
-        token = token.strip()
-        if not token:
-            return []
-        if "~" in token:
-            start_raw, end_raw = [part.strip() for part in token.split("~", 1)]
-            if not start_raw or not end_raw:
-                raise ValueError(f"日期范围格式错误: {token}")
-            start = _parse_single(start_raw)
-            end = _parse_single(end_raw)
-            if end < start:
-                start, end = end, start
-            days: List[date] = []
-            current = start
-            while current <= end:
-                days.append(current)
-                current += timedelta(days=1)
-            return days
-        return [_parse_single(token)]
-
     tokens: List[str]
     if raw.startswith("["):
         try:
@@ -107,18 +122,23 @@ def parse_date_list(value: Optional[str]) -> List[str]:
         else:
             raise ValueError("STYD_DATE 需要为字符串或字符串数组")
     else:
-        tokens = [raw]
-        for sep in ("|", ",", ";", "\n"):
-            if sep in raw:
-                tokens = [part for part in raw.split(sep) if part.strip()]
-                break
+        tokens = [part for part in _DATE_SPLIT.split(raw) if part.strip()]
 
-    collected: dict[str, date] = {}
+    seen: set[date] = set()
+    result: List[date] = []
+    needs_sort = False
     for token in tokens:
-        for item in _expand(token):
-            collected[item.isoformat()] = item
-    ordered = sorted(collected.items(), key=lambda kv: kv[1])
-    return [iso for iso, _ in ordered]
+        for item in _expand_date_token(token):
+            if item in seen:
+                continue
+            if result and item < result[-1]:
+                needs_sort = True
+            seen.add(item)
+            result.append(item)
+    # 区间展开本身有序，仅在输入乱序时才需要排序
+    if needs_sort:
+        result.sort()
+    return [item.isoformat() for item in result]
 
 
 __all__ = [
@@ -1,14 +1,30 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import os
+import random
 import re
+import threading
 import time
 import urllib.parse as urlparse
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+try:  # pyahocorasick 可选，缺失时失败原因分类走正则
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+try:  # orjson 可选，直接解析字节，缺失时退回标准库
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - optional dependency
+    from json import loads as _json_loads
 
 API_BASE = os.environ.get("API_BASE_URL", "https://api.example.com").rstrip("/")
 SPACE = os.environ.get("API_NAMESPACE", "demo_space")
@@ -26,7 +42,9 @@ DEFAULT_MEMBER_CARD_ID = os.environ.get("DEFAULT_MEMBER_CARD_ID", "CARD_PLACEHOL
 DEFAULT_CARD_CAT_ID = os.environ.get("DEFAULT_CARD_CAT_ID", "CAT_PLACEHOLDER")
 DEFAULT_COURSE_ID = os.environ.get("DEFAULT_COURSE_ID", "COURSE_PLACEHOLDER")
 
-_AVAILABLE_STATUSES = {"available", "hot", "queue"}
+_AVAILABLE_STATUSES = frozenset({"available", "hot", "queue"})
+# 课程状态取自 course_status 元素的 class，多个同时出现时按此顺序取
+_STATUS_ORDER = ("available", "hot", "full", "stop", "queue")
 _BUSY_KEYWORDS = ("系统繁忙", "稍后再试", "操作频繁", "频繁")
 _FULL_KEYWORDS = ("课程已满", "排队", "不在可预约时间", "已满", "名额已满", "约满")
 _LOGIN_KEYWORDS = ("请先登录", "登录后访问", "手机号", "验证码")
@@ -34,7 +52,93 @@ _CARD_KEYWORDS = ("请选择会员卡", "会员卡", "卡")
 _SUCCESS_KEYWORDS = ("成功", "预约成功", "success")
 
 
-@dataclass
+def _keyword_pattern(keywords: Sequence[str]) -> re.Pattern[str]:
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+_BUSY_RE = _keyword_pattern(_BUSY_KEYWORDS)
+_LOGIN_RE = _keyword_pattern(_LOGIN_KEYWORDS)
+_SUCCESS_RE = _keyword_pattern(_SUCCESS_KEYWORDS)
+# 繁忙/失败原因等关键词都出现在响应开头，只扫描前 4KB
+_SCAN_LIMIT = 4096
+# 失败原因分类：四组关键词合成一个带命名分组的正则，只扫描正文一次
+_REASON_GROUPS = (
+    ("BUSY", _BUSY_KEYWORDS),
+    ("CARD", _CARD_KEYWORDS),
+    ("FULL", _FULL_KEYWORDS),
+    ("LOGIN", _LOGIN_KEYWORDS),
+)
+_REASON_RE = re.compile(
+    "|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, keywords))})" for name, keywords in _REASON_GROUPS
+    )
+)
+# 按原有判断顺序排列优先级
+_REASON_BY_GROUP = (
+    ("BUSY", "RATE_LIMIT"),
+    ("CARD", "CARD_MISSING"),
+    ("FULL", "COURSE_FULL"),
+    ("LOGIN", "REDIRECT_LOGIN"),
+)
+
+
+def _build_reason_automaton() -> Any:
+    # 同一关键词可能属于多个分组，值保存分组集合
+    groups_by_word: Dict[str, set] = {}
+    for name, keywords in _REASON_GROUPS:
+        for kw in keywords:
+            groups_by_word.setdefault(kw, set()).add(name)
+    automaton = ahocorasick.Automaton()
+    for kw, names in groups_by_word.items():
+        automaton.add_word(kw, frozenset(names))
+    automaton.make_automaton()
+    return automaton
+
+
+_REASON_AC = _build_reason_automaton() if ahocorasick is not None else None
+_CLASS_ID_RE = re.compile(r"[?&]id=(\d+)")
+_COURSE_ID_PATTERNS = (
+    re.compile(r'name="course_id"\s+value="(\d+)"'),
+    re.compile(r"course_id\"?\s*[:=]\s*\"?(\d+)"),
+)
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# 预编译 XPath，直接在 libxml2 树上求值
+_COURSE_ITEMS_XP = etree.XPath(f"//ul[{_has_class('course_list')}]/li")
+_COURSE_LINK_XP = etree.XPath(f"(.//a[{_has_class('course_link')}])[1]")
+# 标题与时段取各文本节点去空白后直接拼接，与 get_text(strip=True) 一致
+_COURSE_TITLE_XP = etree.XPath(
+    f"(.//*[{_has_class('course_detail')}]//*[{_has_class('name')}])[1]//text()"
+)
+_COURSE_TIME_XP = etree.XPath(
+    f"(.//*[{_has_class('course_detail')}]//*[{_has_class('date')}]//b)[1]//text()"
+)
+_COURSE_THUMBS_XP = etree.XPath(f"string((.//*[{_has_class('course_thumbs')}]//span)[1])")
+_COURSE_STATUS_XP = etree.XPath(
+    f"string((.//*[{_has_class('book_status')}]//i[{_has_class('course_status')}])[1]/@class)"
+)
+# type 属性值按 HTML 约定不区分大小写
+_HIDDEN_INPUT_XP = etree.XPath(
+    "//input[translate(@type, 'HIDEN', 'hiden')='hidden'][@name]"
+)
+_SELECT_XP = etree.XPath("//select[@name]")
+_SELECTED_OPTION_XP = etree.XPath("(.//option[@selected])[1]")
+_FIRST_OPTION_XP = etree.XPath("(.//option)[1]")
+_CARD_ITEMS_XP = etree.XPath(f"//*[{_has_class('user_card')}]//ul[{_has_class('card_list')}]/li")
+_CARD_NAME_XP = etree.XPath(
+    f"string((.//*[{_has_class('card_overview')}]//*[{_has_class('name')}]//p)[1])"
+)
+_CARD_HREF_XP = etree.XPath(
+    f"string((.//*[{_has_class('card_overview')}]//*[{_has_class('charge')}]"
+    f"//a[{_has_class('charge_card')}][@href])[1]/@href)"
+)
+_QS_RE = re.compile(r"[?&](member_card_id|id)=([^&#]*)")
+
+
+@dataclass(slots=True)
 class Course:
     title: str
     time: str
@@ -74,6 +178,11 @@ class RunOutcome:
     retry_recommended: bool = False
 
 
+# 连接池（keep-alive 连接与 TLS 会话）在所有 Session 之间共享；HTTPAdapter 线程安全，
+# 而 Session 本身带 cookie 等可变状态，每次 run_once 各自新建
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+
+
 def create_session(cookie: str) -> requests.Session:
     sess = requests.Session()
     sess.headers.update(
@@ -85,63 +194,134 @@ def create_session(cookie: str) -> requests.Session:
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
         }
     )
-    cookie = cookie or ""
-    for kv in re.split(r";\s*", cookie.strip()):
-        if "=" not in kv:
-            continue
-        k, v = kv.split("=", 1)
-        if API_HOST:
-            sess.cookies.set(k, v, domain=API_HOST)
-        else:
-            sess.cookies.set(k, v)
+    items: Dict[str, str] = {}
+    for kv in (cookie or "").split(";"):
+        k, sep, v = kv.strip().partition("=")
+        if sep:
+            items[k] = v
+    if API_HOST:
+        for k, v in items.items():
+            sess.cookies.set_cookie(requests.cookies.create_cookie(k, v, domain=API_HOST))
+    else:
+        requests.utils.add_dict_to_cookiejar(sess.cookies, items)
+    sess.mount("https://", _HTTP_ADAPTER)
+    sess.mount("http://", _HTTP_ADAPTER)
     return sess
 
 
-def fetch_search(session: requests.Session, date: str, shop_id: str, tp: str = "1") -> Dict[str, Any]:
-    response = session.get(
-        SEARCH_API,
-        params={"date": date, "shop_id": shop_id, "type": tp},
-        timeout=12,
-    )
-    response.raise_for_status()
-    return response.json()
+# 抢课时会在短时间内反复查询同一天的课表，短 TTL 内直接复用上一次结果。
+# 只缓存带课表的成功结果，繁忙/空课表等响应不缓存，重试时总会重新请求；
+# 键中带上账号标识（cookie 摘要），不同账号之间不会串用课表，命中时返回副本
+_SEARCH_TTL = 0.75
+_SEARCH_CACHE: Dict[Tuple[str, str, str, str], Tuple[float, Dict[str, Any]]] = {}
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+def _has_class_list(data: Any) -> bool:
+    if not isinstance(data, dict):
+        return False
+    class_list = (data.get("data") or {}).get("class_list")
+    return isinstance(class_list, str) and bool(class_list.strip())
+
+
+def fetch_search(
+    session: requests.Session,
+    date: str,
+    shop_id: str,
+    tp: str = "1",
+    *,
+    account_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    key = (account_key, date, shop_id, tp) if account_key else None
+    if key is not None:
+        with _SEARCH_CACHE_LOCK:
+            cached = _SEARCH_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[0] < _SEARCH_TTL:
+            return copy.deepcopy(cached[1])
+    try:
+        response = session.get(
+            SEARCH_API,
+            params={"date": date, "shop_id": shop_id, "type": tp},
+            timeout=12,
+        )
+        response.raise_for_status()
+        data = _json_loads(response.content)
+    except Exception:
+        if key is not None:
+            with _SEARCH_CACHE_LOCK:
+                _SEARCH_CACHE.pop(key, None)
+        raise
+    if key is None:
+        return data
+    now = time.monotonic()
+    with _SEARCH_CACHE_LOCK:
+        # 顺带清掉过期条目，避免缓存无限增长
+        for stale in [k for k, v in _SEARCH_CACHE.items() if now - v[0] >= _SEARCH_TTL]:
+            del _SEARCH_CACHE[stale]
+        if _has_class_list(data):
+            _SEARCH_CACHE[key] = (now, data)
+        else:
+            _SEARCH_CACHE.pop(key, None)
+    return copy.deepcopy(data)
+
 
+# 解析器实例有内部状态，按线程各复用一个
+_PARSER_LOCAL = threading.local()
 
-def parse_courses_from_html(html_ul: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html_ul or "", "lxml")
-    courses: List[Dict[str, Any]] = []
-    for li in soup.select("ul.course_list > li"):
-        a = li.select_one("a.course_link")
-        if not a:
+
+def _html_parser() -> lxml.html.HTMLParser:
+    parser = getattr(_PARSER_LOCAL, "parser", None)
+    if parser is None:
+        parser = lxml.html.HTMLParser(
+            recover=True,
+            remove_blank_text=True,
+            remove_comments=True,
+            remove_pis=True,
+        )
+        _PARSER_LOCAL.parser = parser
+    return parser
+
+
+def _parse_html(html: Optional[str]) -> Optional[etree._Element]:
+    if not html or not html.strip():
+        return None
+    parser = _html_parser()
+    try:
+        return lxml.html.fromstring(html, parser=parser)
+    except ValueError:
+        # 带 encoding 声明的文档不能以 str 形式解析
+        return lxml.html.fromstring(html.encode("utf-8"), parser=parser)
+    except etree.ParserError:
+        return None
+
+
+def _joined_text(nodes: Sequence[str]) -> str:
+    return "".join(node.strip() for node in nodes)
+
+
+def parse_courses_from_html(html_ul: str) -> List[Course]:
+    root = _parse_html(html_ul)
+    if root is None:
+        return []
+    courses: List[Course] = []
+    for li in _COURSE_ITEMS_XP(root):
+        links = _COURSE_LINK_XP(li)
+        if not links:
             continue
-        href = a.get("href", "")
-        title = (li.select_one(".course_detail .name") or {}).get_text(strip=True)
-        timer = (li.select_one(".course_detail .date b") or {}).get_text(strip=True)
+        href = links[0].get("href", "")
+        title = _joined_text(_COURSE_TITLE_XP(li))
+        timer = _joined_text(_COURSE_TIME_XP(li))
         taken, total = 0, 0
-        span = li.select_one(".course_thumbs span")
-        if span and "/" in span.text:
+        thumbs = _COURSE_THUMBS_XP(li)
+        if "/" in thumbs:
             try:
-                taken, total = [int(x.strip()) for x in span.text.strip().split("/", 1)]
+                taken, total = [int(x.strip()) for x in thumbs.strip().split("/", 1)]
             except Exception:
                 pass
-        status = "unknown"
-        status_node = li.select_one(".book_status i.course_status")
-        if status_node:
-            classes = " ".join(status_node.get("class", []))
-            for st in ("available", "hot", "full", "stop", "queue"):
-                if st in classes:
-                    status = st
-                    break
-        courses.append(
-            {
-                "title": title,
-                "time": timer,
-                "taken": taken,
-                "total": total,
-                "status": status,
-                "href": href,
-            }
-        )
+        # 按 _STATUS_ORDER 顺序在 class 串中做子串匹配（如 "unavailable full" 视为 available）
+        classes = " ".join(_COURSE_STATUS_XP(li).split())
+        status = next((st for st in _STATUS_ORDER if st in classes), "unknown")
+        courses.append(Course(title, timer, taken, total, status, href))
     return courses
 
 
@@ -152,29 +332,40 @@ def _keyword_match(value: str, keywords: Sequence[str]) -> bool:
     return any(kw in value for kw in keywords)
 
 
-def _score_course(course: Dict[str, Any], title_keywords: Sequence[str], time_keywords: Sequence[str]) -> Tuple[int, int, float]:
-    kw_rank = min(
-        (i for i, kw in enumerate(title_keywords) if kw and kw in (course.get("title") or "")),
-        default=999,
-    )
-    time_rank = min(
-        (i for i, kw in enumerate(time_keywords) if kw and kw in (course.get("time") or "")),
-        default=999,
-    )
-    total = course.get("total") or 0
-    taken = course.get("taken") or 0
+def _indexed_keywords(keywords: Sequence[str]) -> Tuple[Tuple[int, str], ...]:
+    # 关键词序号与空值过滤在一次选课中只做一次
+    return tuple((i, kw) for i, kw in enumerate(keywords) if kw)
+
+
+def _first_keyword_index(value: str, indexed: Sequence[Tuple[int, str]]) -> int:
+    # 关键词按优先级排列，命中第一个即可返回
+    for i, kw in indexed:
+        if kw in value:
+            return i
+    return 999
+
+
+def _score_course(
+    course: Course,
+    title_indexed: Sequence[Tuple[int, str]],
+    time_indexed: Sequence[Tuple[int, str]],
+) -> Tuple[int, int, float]:
+    kw_rank = _first_keyword_index(course.title or "", title_indexed)
+    time_rank = _first_keyword_index(course.time or "", time_indexed)
+    total = course.total or 0
+    taken = course.taken or 0
     ratio = (taken / total) if total else 1.0
     return kw_rank, time_rank, ratio
 
 
 def select_course(
-    courses: Sequence[Dict[str, Any]],
+    courses: Sequence[Course],
     title_keywords: Sequence[str],
     time_keywords: Sequence[str],
     strict_match: bool,
     allow_fallback: bool,
-) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-    available = [c for c in courses if c.get("status") in _AVAILABLE_STATUSES]
+) -> Tuple[Optional[Course], Optional[str]]:
+    available = [c for c in courses if c.status in _AVAILABLE_STATUSES]
     if not available:
         if courses:
             return None, "COURSE_FULL"
@@ -183,8 +374,8 @@ def select_course(
     strict_pool = [
         c
         for c in available
-        if _keyword_match(c.get("title", ""), title_keywords)
-        and _keyword_match(c.get("time", ""), time_keywords)
+        if _keyword_match(c.title, title_keywords)
+        and _keyword_match(c.time, time_keywords)
     ]
 
     if strict_match:
@@ -197,11 +388,15 @@ def select_course(
     else:
         candidates = strict_pool or available
 
-    candidates = sorted(
+    title_indexed = _indexed_keywords(title_keywords)
+    time_indexed = _indexed_keywords(time_keywords)
+    # 只需要得分最低的一项，min 与稳定排序取首项的结果一致
+    best = min(
         candidates,
-        key=lambda c: _score_course(c, title_keywords, time_keywords),
+        key=lambda c: _score_course(c, title_indexed, time_indexed),
+        default=None,
     )
-    return (candidates[0] if candidates else None, None)
+    return best, None
 
 
 def norm_url(href: str) -> str:
@@ -221,30 +416,27 @@ def get_html_with_browser_headers(session: requests.Session, url: str, referer:
         "Sec-Fetch-Site": "same-origin",
         "Sec-Fetch-Mode": "navigate",
         "Sec-Fetch-Dest": "document",
+        # 页面请求不带会话默认的 AJAX 头
+        "X-Requested-With": None,
     }
-    response = requests.get(
-        url,
-        headers=headers,
-        cookies=session.cookies.get_dict(),
-        timeout=12,
-        allow_redirects=True,
-    )
-    return response
+    return session.get(url, headers=headers, timeout=12, allow_redirects=True)
 
 
 def extract_hidden_fields(order_html: str) -> Dict[str, str]:
-    soup = BeautifulSoup(order_html or "", "lxml")
+    # 注释、<script>、<textarea> 中的 input 不会被解析为元素，与浏览器提交的表单一致
+    root = _parse_html(order_html)
     fields: Dict[str, str] = {}
-    for inp in soup.select("input[type='hidden'][name]"):
-        name = inp.get("name")
-        if not name:
-            continue
-        fields[name] = inp.get("value", "")
-    for sel in soup.select("select[name]"):
-        name = sel.get("name")
-        opt = sel.select_one("option[selected]") or sel.select_one("option")
-        if name and opt:
-            fields.setdefault(name, opt.get("value", ""))
+    if root is not None:
+        for inp in _HIDDEN_INPUT_XP(root):
+            name = inp.get("name")
+            if not name:
+                continue
+            fields[name] = inp.get("value", "")
+        for sel in _SELECT_XP(root):
+            name = sel.get("name")
+            options = _SELECTED_OPTION_XP(sel) or _FIRST_OPTION_XP(sel)
+            if name and options:
+                fields.setdefault(name, options[0].get("value", ""))
     fields.setdefault("note", "")
     fields.setdefault("quantity", fields.get("quantity") or "1")
     fields.setdefault("is_waiting", fields.get("is_waiting") or "")
@@ -259,16 +451,16 @@ def fetch_cards_from_user_card(session: requests.Session) -> List[Dict[str, str]
         referer=f"{API_BASE}/m/{SPACE}/default/index?type=1",
     )
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "lxml")
+    root = _parse_html(response.text)
     cards: List[Dict[str, str]] = []
-    for li in soup.select(".user_card ul.card_list > li"):
-        name = (li.select_one(".card_overview .name p") or {}).get_text(strip=True)
-        a = li.select_one(".card_overview .charge a.charge_card[href]")
-        if not a:
+    if root is None:
+        return cards
+    for li in _CARD_ITEMS_XP(root):
+        name = _CARD_NAME_XP(li).strip()
+        href = _CARD_HREF_XP(li)
+        if not href:
             continue
-        href = a.get("href", "")
-        query = urlparse.urlparse(href).query
-        qs = dict(urlparse.parse_qsl(query))
+        qs = {key: urlparse.unquote_plus(value) for key, value in _QS_RE.findall(href)}
         member_card_id = qs.get("member_card_id")
         card_cat_id = qs.get("id")
         if member_card_id and card_cat_id:
@@ -296,6 +488,9 @@ def pick_card_by_keywords(cards: Sequence[Dict[str, str]], keywords: Sequence[st
     return sorted(cards, key=score)[0]
 
 
+_CONFIRM_ATTEMPTS = 3
+
+
 def post_order_confirm(session: requests.Session, referer: str, payload: Dict[str, str]) -> requests.Response:
     headers = {
         "User-Agent": MOBILE_UA,
@@ -306,7 +501,7 @@ def post_order_confirm(session: requests.Session, referer: str, payload: Dict[st
         "Referer": referer,
     }
     last_response: Optional[requests.Response] = None
-    for attempt in range(2):
+    for attempt in range(_CONFIRM_ATTEMPTS):
         response = session.post(
             ORDER_CONFIRM,
             data=payload,
@@ -315,25 +510,53 @@ def post_order_confirm(session: requests.Session, referer: str, payload: Dict[st
         )
         last_response = response
         retry = False
-        if any(word in response.text for word in _BUSY_KEYWORDS):
+        # 只解码开头部分判断是否繁忙
+        if _BUSY_RE.search(response.content[:_SCAN_LIMIT].decode("utf-8", "ignore")):
             retry = True
         else:
             try:
-                data = response.json()
+                data = _json_loads(response.content)
             except ValueError:
                 data = None
             if isinstance(data, dict) and data.get("code") == -1:
                 retry = True
-        if not retry or attempt == 1:
+        if not retry or attempt == _CONFIRM_ATTEMPTS - 1:
             break
-        time.sleep(0.2)
+        # 指数退避并加入随机抖动，避免多个账号同时重试
+        time.sleep(min(0.05 * (2 ** attempt) + random.uniform(0, 0.05), 0.6))
     return last_response  # type: ignore[return-value]
 
 
+def _classify_reason(body: str) -> str:
+    found = set()
+    if _REASON_AC is not None:
+        for _, names in _REASON_AC.iter(body):
+            if "BUSY" in names:
+                return "RATE_LIMIT"
+            found |= names
+    else:
+        for match in _REASON_RE.finditer(body):
+            group = match.lastgroup
+            if group == "BUSY":
+                return "RATE_LIMIT"
+            found.add(group)
+    for group, reason in _REASON_BY_GROUP:
+        if group in found:
+            return reason
+    return "UNKNOWN"
+
+
 def run_once(request: RunRequest) -> RunOutcome:
     session = create_session(request.cookie)
+    account_key = hashlib.sha1((request.cookie or "").encode("utf-8")).hexdigest()
     try:
-        search_data = fetch_search(session, date=request.date, shop_id=request.shop_id, tp="1")
+        search_data = fetch_search(
+            session,
+            date=request.date,
+            shop_id=request.shop_id,
+            tp="1",
+            account_key=account_key,
+        )
     except requests.HTTPError as exc:  # pragma: no cover - network specific
         status = exc.response.status_code if exc.response else None
         if status in (401, 403):
@@ -371,7 +594,7 @@ def run_once(request: RunRequest) -> RunOutcome:
     if not class_list_html.strip():
         msg = search_data.get("msg") if isinstance(search_data, dict) else None
         reason = "COOKIE_INVALID"
-        if msg and any(word in msg for word in _BUSY_KEYWORDS):
+        if msg and _BUSY_RE.search(msg):
             reason = "RATE_LIMIT"
         return RunOutcome(
             success=False,
@@ -409,8 +632,10 @@ def run_once(request: RunRequest) -> RunOutcome:
             evidence=f"选课失败: reason={reason} strict={request.strict_match} allow_fallback={request.allow_fallback}",
         )
 
-    order_url = norm_url(selected_course.get("href", ""))
-    match = re.search(r"[?&]id=(\d+)", order_url)
+    # RunOutcome.course 对外仍是字典
+    course_info = asdict(selected_course)
+    order_url = norm_url(selected_course.href)
+    match = _CLASS_ID_RE.search(order_url)
     class_id = match.group(1) if match else ""
 
     referer = f"{API_BASE}/m/{SPACE}/default/index?type=1"
@@ -424,7 +649,7 @@ def run_once(request: RunRequest) -> RunOutcome:
             code=None,
             msg="订单页拉取失败",
             req_id=None,
-            course=selected_course,
+            course=course_info,
             final_url=final_order_url,
             evidence=f"订单页返回状态码 {order_response.status_code}",
         )
@@ -436,12 +661,14 @@ def run_once(request: RunRequest) -> RunOutcome:
             code=None,
             msg="订单页重定向至登录",
             req_id=None,
-            course=selected_course,
+            course=course_info,
             final_url=final_order_url,
             evidence=f"订单页被重定向到 {final_order_url}",
         )
-    if any(word in order_response.text for word in _LOGIN_KEYWORDS):
-        snippet = order_response.text[:120]
+    # Response.text 每次访问都会重新解码，这里只取一次
+    order_text = order_response.text
+    if _LOGIN_RE.search(order_text):
+        snippet = order_text[:120]
         return RunOutcome(
             success=False,
             reason="COOKIE_INVALID",
@@ -449,21 +676,18 @@ def run_once(request: RunRequest) -> RunOutcome:
             code=None,
             msg="页面提示需要登录",
             req_id=None,
-            course=selected_course,
+            course=course_info,
             final_url=final_order_url,
             evidence=f"订单页提示登录: {snippet}",
         )
 
-    fields = extract_hidden_fields(order_response.text)
+    fields = extract_hidden_fields(order_text)
     if class_id:
         fields.setdefault("class_id", class_id)
 
     if not fields.get("course_id") and request.default_course_id:
-        for pattern in [
-            r'name="course_id"\s+value="(\d+)"',
-            r"course_id\"?\s*[:=]\s*\"?(\d+)",
-        ]:
-            m = re.search(pattern, order_response.text)
+        for pattern in _COURSE_ID_PATTERNS:
+            m = pattern.search(order_text)
             if m:
                 fields["course_id"] = m.group(1)
                 break
@@ -477,7 +701,7 @@ def run_once(request: RunRequest) -> RunOutcome:
             code=None,
             msg="未解析到 course_id",
             req_id=None,
-            course=selected_course,
+            course=course_info,
             final_url=final_order_url,
             evidence="订单页缺少 course_id 字段",
         )
@@ -511,7 +735,7 @@ def run_once(request: RunRequest) -> RunOutcome:
                     code=None,
                     msg=last_err or "未找到可用卡",
                     req_id=None,
-                    course=selected_course,
+                    course=course_info,
                     final_url=final_order_url,
                     evidence="未能解析到 member_card_id/card_cat_id",
                 )
@@ -524,7 +748,7 @@ def run_once(request: RunRequest) -> RunOutcome:
             code=None,
             msg="缺少卡信息",
             req_id=None,
-            course=selected_course,
+            course=course_info,
             final_url=final_order_url,
             evidence="提交订单所需卡信息缺失",
         )
@@ -537,32 +761,28 @@ def run_once(request: RunRequest) -> RunOutcome:
     confirm_response = post_order_confirm(session, referer=order_url, payload=fields)
     http_status = confirm_response.status_code
     final_confirm_url = confirm_response.url or order_url
-    text_head = confirm_response.text[:300]
-    code = None
-    msg = None
-    req_id = None
+    confirm_text = confirm_response.text or ""
+    text_head = confirm_text[:300]
     try:
-        data = confirm_response.json()
+        data = _json_loads(confirm_response.content)
     except ValueError:
         data = None
-    if isinstance(data, dict):
+    if type(data) is dict:
         code = data.get("code")
         msg = data.get("msg")
         req_id = data.get("req_id")
     else:
+        code = None
         msg = text_head
+        req_id = None
+
+    success = (
+        code == 200
+        or (isinstance(msg, str) and _SUCCESS_RE.search(msg) is not None)
+        or _SUCCESS_RE.search(confirm_text) is not None
+    )
 
-    success = False
-    if isinstance(data, dict) and data.get("code") == 200:
-        success = True
-    if not success and msg and any(word in msg for word in _SUCCESS_KEYWORDS):
-        success = True
-    if not success and confirm_response.text and any(
-        word in confirm_response.text for word in _SUCCESS_KEYWORDS
-    ):
-        success = True
-
-    body = confirm_response.text or ""
+    body = confirm_text[:_SCAN_LIMIT]
     evidence = ""
     reason = "OK" if success else "UNKNOWN"
     if success:
@@ -571,16 +791,8 @@ def run_once(request: RunRequest) -> RunOutcome:
         evidence = f"order_confirm返回: code={code} msg={msg or text_head}"
         if any(k in final_confirm_url for k in ("/login", "/passport")):
             reason = "REDIRECT_LOGIN"
-        elif any(word in body for word in _BUSY_KEYWORDS):
-            reason = "RATE_LIMIT"
-        elif any(word in body for word in _CARD_KEYWORDS):
-            reason = "CARD_MISSING"
-        elif any(word in body for word in _FULL_KEYWORDS):
-            reason = "COURSE_FULL"
-        elif any(word in body for word in _LOGIN_KEYWORDS):
-            reason = "REDIRECT_LOGIN"
         else:
-            reason = "UNKNOWN"
+            reason = _classify_reason(body)
 
     return RunOutcome(
         success=success,
@@ -590,8 +802,8 @@ def run_once(request: RunRequest) -> RunOutcome:
         msg=msg,
         req_id=req_id,
         course={
-            "title": selected_course.get("title", ""),
-            "time": selected_course.get("time", ""),
+            "title": selected_course.title,
+            "time": selected_course.time,
             "href": order_url,
         },
         final_url=final_confirm_url,
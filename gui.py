@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import collections
+import contextlib
 import datetime as dt
+import functools
+import io
+import itertools
 import json
-import queue
+import re
 import sys
 import threading
-from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
@@ -16,13 +23,16 @@ from tkinter import filedialog, messagebox, scrolledtext, ttk
 from config import AccountConfig, AppConfig, TaskConfig
 from config_utils import parse_date_list, parse_delay
 from privacy import mask_identifier, sanitize_payload, sanitize_text, sanitise_and_dump_json
-from runner import TaskExecutionRecord, run_tasks
+
+# runner 会连带导入 requests、HTML 解析等重量级依赖，推迟到首次执行时再导入
+if TYPE_CHECKING:
+    from runner import TaskExecutionRecord
 
 DEFAULT_SHOP_ID = "SHOP_0001"
 EXAMPLE_COOKIE = "SESSION=EXAMPLE; TOKEN=EXAMPLE; ID=SHOP_0001"
 
-_THEME_MAP: Dict[str, Dict[str, str]] = {
-    "light": {
+_THEME_MAP: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    "light": MappingProxyType({
         "primary": "#2563eb",
         "primary-active": "#1d4ed8",
         "text": "#111827",
@@ -33,8 +43,8 @@ _THEME_MAP: Dict[str, Dict[str, str]] = {
         "focus": "#93c5fd",
         "danger": "#ef4444",
         "success": "#10b981",
-    },
-    "dark": {
+    }),
+    "dark": MappingProxyType({
         "primary": "#60a5fa",
         "primary-active": "#3b82f6",
         "text": "#e2e8f0",
@@ -45,23 +55,262 @@ _THEME_MAP: Dict[str, Dict[str, str]] = {
         "focus": "#60a5fa",
         "danger": "#f87171",
         "success": "#34d399",
-    },
+    }),
+})
+
+_POLL_ACTIVE_MS = 10
+_POLL_IDLE_MS = 100
+_POLL_BATCH_LIMIT = 4096
+_PREVIEW_DEBOUNCE_MS = 200
+_LOG_MAX_LINES = 5000
+_WRITER_FLUSH_CHARS = 4096
+_HISTORY_FLUSH_MS = 500
+_HISTORY_MAX_ROWS = 200
+
+# 日志级别判定：出现 ERROR 即为错误，否则 [WARN / WARNING 视为警告（均不区分大小写）
+_LEVEL_RE = re.compile(r"(ERROR)|\[WARN|WARNING", re.IGNORECASE)
+_ERROR_LEVEL_RE = re.compile("ERROR", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=512)
+def _is_iso_date(value: str) -> bool:
+    if len(value) != 10 or value[4] != "-" or value[7] != "-":
+        return False
+    if not (value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()):
+        return False
+    try:
+        dt.date(int(value[:4]), int(value[5:7]), int(value[8:]))
+    except ValueError:
+        return False
+    return True
+
+
+_VALIDATION_ICONS: Dict[str, str] = {"info": "ℹ", "error": "⚠", "success": "✔"}
+_VALIDATION_PREFIX: Dict[str, str] = {kind: f"{icon} " for kind, icon in _VALIDATION_ICONS.items()}
+_VALIDATION_STYLES: Dict[str, str] = {
+    "info": "Validation.Info.TLabel",
+    "error": "Validation.Error.TLabel",
+    "success": "Validation.Success.TLabel",
 }
 
 
+def _render_preview(payload: Dict[str, object]) -> str:
+    masked = dict(payload)
+    masked["shop_id"] = mask_identifier(str(payload["shop_id"]), placeholder="SHOP")
+    masked["account"] = mask_identifier(str(payload["account"]), placeholder="ACCOUNT")
+    return sanitise_and_dump_json(sanitize_payload(masked))
+
+
+class _ThemeStylePlan(NamedTuple):
+    configure: Tuple[Tuple[str, Mapping[str, object]], ...]
+    maps: Tuple[Tuple[str, Mapping[str, object]], ...]
+    text_widget: Mapping[str, object]
+
+
+class _FormSnapshot(NamedTuple):
+    cookie: str
+    account_name: str
+    shop_id: str
+    preferred_cards: List[str]
+    title_keywords: List[str]
+    time_keywords: List[str]
+    date_tokens: List[str]
+    max_attempts: object
+    delay_low: object
+    delay_high: object
+    strict_match: bool
+    allow_fallback: bool
+    global_timeout: str
+    concurrency: object
+    log_json: bool
+
+
+def _build_theme_style_plan(palette: Mapping[str, str]) -> _ThemeStylePlan:
+    bg = palette["bg"]
+    elev = palette["bg-elev"]
+    configure = (
+        ("TFrame", {"background": bg}),
+        ("Title.TLabel", {"background": bg, "foreground": palette["text"]}),
+        ("Subtitle.TLabel", {"background": bg, "foreground": palette["text-muted"]}),
+        ("CardTitle.TLabel", {"background": bg, "foreground": palette["text"]}),
+        ("CardSubtitle.TLabel", {"background": bg, "foreground": palette["text-muted"]}),
+        ("FormLabel.TLabel", {"background": bg, "foreground": palette["text"]}),
+        ("Hint.TLabel", {"background": bg, "foreground": palette["text-muted"]}),
+        ("Placeholder.TLabel", {"background": bg, "foreground": palette["text-muted"]}),
+        ("Validation.Info.TLabel", {"background": bg, "foreground": palette["text-muted"]}),
+        ("Validation.Error.TLabel", {"background": bg, "foreground": palette["danger"]}),
+        ("Validation.Success.TLabel", {"background": bg, "foreground": palette["success"]}),
+        ("Card.TFrame", {"background": elev, "relief": "flat", "borderwidth": 0}),
+        (
+            "Tag.TFrame",
+            {"background": elev, "relief": "solid", "bordercolor": palette["border"]},
+        ),
+        ("Tag.TLabel", {"background": elev, "foreground": palette["text"]}),
+        (
+            "Primary.TButton",
+            {
+                "background": palette["primary"],
+                "foreground": "#ffffff",
+                "focusthickness": 3,
+                "focuscolor": palette["focus"],
+                "bordercolor": palette["primary"],
+            },
+        ),
+        (
+            "TButton",
+            {
+                "background": elev,
+                "foreground": palette["text"],
+                "bordercolor": palette["border"],
+            },
+        ),
+        (
+            "Horizontal.TProgressbar",
+            {
+                "background": palette["primary"],
+                "troughcolor": elev,
+                "bordercolor": palette["border"],
+            },
+        ),
+    )
+    maps = (
+        (
+            "Primary.TButton",
+            {
+                "background": [
+                    ("pressed", palette["primary-active"]),
+                    ("active", palette["primary-active"]),
+                    ("!disabled", palette["primary"]),
+                ],
+                "foreground": [("disabled", palette["text-muted"]), ("!disabled", "#ffffff")],
+            },
+        ),
+        (
+            "TButton",
+            {
+                "background": [("pressed", palette["border"]), ("active", palette["focus"])],
+                "foreground": [
+                    ("disabled", palette["text-muted"]),
+                    ("!disabled", palette["text"]),
+                ],
+            },
+        ),
+    )
+    text_widget = {
+        "background": elev,
+        "foreground": palette["text"],
+        "insertbackground": palette["primary"],
+        "highlightthickness": 1,
+        "highlightbackground": palette["border"],
+        "highlightcolor": palette["focus"],
+    }
+    return _ThemeStylePlan(
+        configure=tuple((name, MappingProxyType(opts)) for name, opts in configure),
+        maps=tuple((name, MappingProxyType(opts)) for name, opts in maps),
+        text_widget=MappingProxyType(text_widget),
+    )
+
+
+# 每个主题需要下发的样式在导入时一次性算好，切换主题时只需逐项应用
+_THEME_STYLE_PLAN: Mapping[str, _ThemeStylePlan] = MappingProxyType(
+    {theme: _build_theme_style_plan(palette) for theme, palette in _THEME_MAP.items()}
+)
+
+
 class QueueWriter:
     """Write stdout/stderr data into a Tk-safe queue."""
 
-    def __init__(self, target: "queue.Queue[tuple[str, object]]") -> None:
+    def __init__(self, target: "collections.deque[tuple[str, object]]") -> None:
         self._target = target
+        self._buf = io.StringIO()
+        self._lock = threading.Lock()
 
     def write(self, data: str) -> None:  # pragma: no cover - UI side-effect
         if not data:
             return
-        self._target.put(("log", data))
+        # print 会把正文和换行拆成两次 write，攒到整行再入队
+        with self._lock:
+            self._buf.write(data)
+            if "\n" in data:
+                head, _, tail = self._buf.getvalue().rpartition("\n")
+                chunk = head + "\n"
+                self._buf = io.StringIO()
+                self._buf.write(tail)
+            elif self._buf.tell() > _WRITER_FLUSH_CHARS:
+                # 长时间不换行的输出（如进度条）超过阈值也整体送出
+                chunk = self._buf.getvalue()
+                self._buf = io.StringIO()
+            else:
+                return
+        self._target.append(("log", chunk))
+
+    def flush(self) -> None:  # pragma: no cover - UI side-effect
+        with self._lock:
+            content = self._buf.getvalue()
+            if not content:
+                return
+            self._buf = io.StringIO()
+        self._target.append(("log", content))
+
+
+# 当前线程的输出目标；未绑定的线程照常写到原始 stdout/stderr
+_OUTPUT_ROUTE = threading.local()
+
 
-    def flush(self) -> None:  # pragma: no cover - compatibility
-        pass
+class _ThreadRoutedStream:
+    """Stand-in for sys.stdout/sys.stderr that routes writes per thread."""
+
+    def __init__(self, fallback: Optional[io.TextIOBase]) -> None:
+        self._fallback = fallback
+
+    def _target(self) -> Optional[object]:
+        return getattr(_OUTPUT_ROUTE, "writer", None) or self._fallback
+
+    def write(self, data: str) -> int:  # pragma: no cover - UI side-effect
+        target = self._target()
+        # pythonw 下原始流为 None，未绑定线程的输出直接丢弃
+        if target is not None:
+            target.write(data)
+        return len(data)
+
+    def flush(self) -> None:  # pragma: no cover - UI side-effect
+        target = self._target()
+        if target is not None:
+            target.flush()
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self._fallback, name)
+
+
+def _install_output_routing() -> None:
+    # 只在启动时替换一次 sys.stdout/sys.stderr，运行期间不再改动进程级状态
+    if not isinstance(sys.stdout, _ThreadRoutedStream):
+        sys.stdout = _ThreadRoutedStream(sys.stdout)
+    if not isinstance(sys.stderr, _ThreadRoutedStream):
+        sys.stderr = _ThreadRoutedStream(sys.stderr)
+
+
+@contextlib.contextmanager
+def _route_output(writer: QueueWriter) -> Iterator[None]:
+    previous = getattr(_OUTPUT_ROUTE, "writer", None)
+    _OUTPUT_ROUTE.writer = writer
+    try:
+        yield
+    finally:
+        _OUTPUT_ROUTE.writer = previous
+
+
+@dataclass(slots=True)
+class LogRecord:
+    """Single captured log line; the sanitised form is derived on display."""
+
+    level: str
+    raw: str
+    ts: str
+
+    def display(self, show_sensitive: bool) -> str:
+        # sanitize_text 自带缓存，重复渲染同一行不会重复脱敏
+        return self.raw if show_sensitive else sanitize_text(self.raw)
 
 
 class PlaceholderEntry(ttk.Frame):
@@ -82,19 +331,25 @@ class PlaceholderEntry(ttk.Frame):
         self.placeholder = placeholder
         self._placeholder_label = ttk.Label(self, text=placeholder, style="Placeholder.TLabel")
         self._placeholder_label.place(in_=self.entry, relx=0.02, rely=0.5, anchor="w")
+        self._placeholder_visible = True
         self.variable.trace_add("write", lambda *_: self._toggle_placeholder())
         self.entry.bind("<FocusIn>", lambda _: self._hide_placeholder())
         self.entry.bind("<FocusOut>", lambda _: self._toggle_placeholder())
         self._toggle_placeholder()
 
     def _toggle_placeholder(self) -> None:
-        if self.variable.get().strip():
+        value = self.variable.get()
+        if value and not value.isspace():
             self._hide_placeholder()
-        else:
+        elif not self._placeholder_visible:
             self._placeholder_label.place(in_=self.entry, relx=0.02, rely=0.5, anchor="w")
+            self._placeholder_visible = True
 
     def _hide_placeholder(self) -> None:
-        self._placeholder_label.place_forget()
+        # 状态未变化时不再发起 Tcl 调用
+        if self._placeholder_visible:
+            self._placeholder_label.place_forget()
+            self._placeholder_visible = False
 
     def get(self) -> str:
         return self.variable.get().strip()
@@ -117,15 +372,79 @@ class ValidationMessage(ttk.Label):
         self.configure(text="", style="Validation.Info.TLabel")
 
     def show(self, message: str, *, kind: str = "info") -> None:
-        icon_map = {"info": "ℹ", "error": "⚠", "success": "✔"}
-        style_map = {
-            "info": "Validation.Info.TLabel",
-            "error": "Validation.Error.TLabel",
-            "success": "Validation.Success.TLabel",
-        }
-        icon = icon_map.get(kind, "ℹ")
-        style = style_map.get(kind, "Validation.Info.TLabel")
-        self.configure(text=f"{icon} {message}", style=style)
+        prefix = _VALIDATION_PREFIX.get(kind, "ℹ ")
+        style = _VALIDATION_STYLES.get(kind, "Validation.Info.TLabel")
+        self.configure(text=prefix + message, style=style)
+
+
+class _ChipFlow:
+    """Keep a container of removable chips in sync with an ordered value list."""
+
+    def __init__(
+        self,
+        container: ttk.Frame,
+        *,
+        columns: int,
+        hint: str,
+        on_remove: Callable[[str], None],
+    ) -> None:
+        self._container = container
+        self._columns = columns
+        self._hint_text = hint
+        self._on_remove = on_remove
+        self._chips: Dict[str, ttk.Frame] = {}
+        self._order: List[str] = []
+        self._rows: List[ttk.Frame] = []
+        self._hint: Optional[ttk.Label] = None
+
+    def _create_chip(self, value: str) -> ttk.Frame:
+        chip = ttk.Frame(self._container, style="Tag.TFrame")
+        ttk.Label(chip, text=value, style="Tag.TLabel").pack(side="left", padx=(8, 4))
+        ttk.Button(
+            chip,
+            text="✕",
+            width=2,
+            command=lambda: self._on_remove(value),
+        ).pack(side="right", padx=(0, 6))
+        return chip
+
+    def sync(self, values: Sequence[str], present: Set[str]) -> None:
+        for value in [v for v in self._chips if v not in present]:
+            self._chips.pop(value).destroy()
+        # 只重排第一个发生变化的位置之后的标签，前面的保持不动
+        first_dirty = 0
+        for old, new in zip(self._order, values):
+            if old != new:
+                break
+            first_dirty += 1
+        for value in self._order[first_dirty:]:
+            chip = self._chips.get(value)
+            if chip is not None:
+                chip.pack_forget()
+
+        rows_needed = -(-len(values) // self._columns)
+        while len(self._rows) > rows_needed:
+            self._rows.pop().destroy()
+        while len(self._rows) < rows_needed:
+            row = ttk.Frame(self._container)
+            row.pack(fill="x", anchor="w")
+            self._rows.append(row)
+        for idx in range(first_dirty, len(values)):
+            value = values[idx]
+            chip = self._chips.get(value)
+            if chip is None:
+                chip = self._create_chip(value)
+                self._chips[value] = chip
+            chip.pack(in_=self._rows[idx // self._columns], side="left", padx=(0, 8), pady=(0, 8))
+        self._order = list(values)
+
+        if values:
+            if self._hint is not None:
+                self._hint.destroy()
+                self._hint = None
+        elif self._hint is None:
+            self._hint = ttk.Label(self._container, text=self._hint_text, style="Hint.TLabel")
+            self._hint.pack(anchor="w")
 
 
 class TagInput(ttk.Frame):
@@ -141,6 +460,7 @@ class TagInput(ttk.Frame):
         super().__init__(master)
         self.columnconfigure(0, weight=1)
         self._tags: List[str] = []
+        self._tag_set: Set[str] = set()
         self._on_change = on_change
         self._entry = PlaceholderEntry(self, placeholder=placeholder)
         self._entry.grid(row=0, column=0, sticky="ew")
@@ -148,7 +468,9 @@ class TagInput(ttk.Frame):
         self._entry.entry.bind("<FocusOut>", self._handle_commit)
         self._chips = ttk.Frame(self)
         self._chips.grid(row=1, column=0, sticky="ew", pady=(6, 0))
-        self._chips.columnconfigure(0, weight=1)
+        self._chip_flow = _ChipFlow(
+            self._chips, columns=3, hint="示例：瑜伽、力量", on_remove=self.remove
+        )
 
     def _handle_commit(self, event: tk.Event[tk.Widget]) -> None:  # pragma: no cover
         value = self._entry.get()
@@ -156,35 +478,21 @@ class TagInput(ttk.Frame):
             return
         parts = [part.strip() for part in value.replace("\n", ",").split(",") if part.strip()]
         for part in parts:
-            if part not in self._tags:
+            if part not in self._tag_set:
                 self._tags.append(part)
+                self._tag_set.add(part)
         self._entry.set("")
         self._render_tags()
         if self._on_change:
             self._on_change()
 
     def _render_tags(self) -> None:
-        for child in list(self._chips.winfo_children()):
-            child.destroy()
-        if not self._tags:
-            hint = ttk.Label(self._chips, text="示例：瑜伽、力量", style="Hint.TLabel")
-            hint.grid(row=0, column=0, sticky="w")
-            return
-        for idx, tag in enumerate(self._tags):
-            chip = ttk.Frame(self._chips, style="Tag.TFrame")
-            chip.grid(row=idx // 3, column=idx % 3, padx=(0, 8), pady=(0, 8), sticky="w")
-            ttk.Label(chip, text=tag, style="Tag.TLabel").pack(side="left", padx=(8, 4))
-            remove_btn = ttk.Button(
-                chip,
-                text="✕",
-                width=2,
-                command=lambda value=tag: self.remove(value),
-            )
-            remove_btn.pack(side="right", padx=(0, 6))
+        self._chip_flow.sync(self._tags, self._tag_set)
 
     def remove(self, value: str) -> None:
-        if value in self._tags:
+        if value in self._tag_set:
             self._tags.remove(value)
+            self._tag_set.discard(value)
             self._render_tags()
             if self._on_change:
                 self._on_change()
@@ -193,13 +501,15 @@ class TagInput(ttk.Frame):
         return list(self._tags)
 
     def set_tags(self, tags: Iterable[str]) -> None:
-        self._tags = [str(tag).strip() for tag in tags if str(tag).strip()]
+        self._tags = [text for tag in tags if (text := str(tag).strip())]
+        self._tag_set = set(self._tags)
         self._render_tags()
         if self._on_change:
             self._on_change()
 
     def clear(self) -> None:
         self._tags.clear()
+        self._tag_set.clear()
         self._render_tags()
         if self._on_change:
             self._on_change()
@@ -212,6 +522,7 @@ class DateRangePicker(ttk.Frame):
         super().__init__(master)
         self.columnconfigure(0, weight=1)
         self._segments: List[str] = []
+        self._segment_set: Set[str] = set()
         self._on_change = on_change
         actions = ttk.Frame(self)
         actions.grid(row=0, column=0, sticky="w")
@@ -223,88 +534,86 @@ class DateRangePicker(ttk.Frame):
         ).pack(side="left", padx=(12, 0))
         self._chips = ttk.Frame(self)
         self._chips.grid(row=1, column=0, sticky="ew", pady=(8, 0))
-        self._chips.columnconfigure(0, weight=1)
+        self._chip_flow = _ChipFlow(
+            self._chips, columns=2, hint="尚未选择日期", on_remove=self.remove
+        )
+        self._dialog: Optional[tk.Toplevel] = None
+        self._dialog_start_var = tk.StringVar(self)
+        self._dialog_end_var = tk.StringVar(self)
 
     def _open_dialog(self) -> None:
+        # 对话框只创建一次，之后隐藏/显示复用
+        if self._dialog is None:
+            self._dialog = self._build_dialog()
+        self._dialog_start_var.set("")
+        self._dialog_end_var.set("")
+        self._dialog.deiconify()
+        self._dialog.lift()
+        self._dialog.grab_set()
+        self._dialog_start_entry.focus_set()
+
+    def _build_dialog(self) -> tk.Toplevel:
         dialog = tk.Toplevel(self)
         dialog.title("选择日期")
         dialog.transient(self.winfo_toplevel())
-        dialog.grab_set()
         dialog.geometry("320x200")
-
-        start_var = tk.StringVar()
-        end_var = tk.StringVar()
+        dialog.protocol("WM_DELETE_WINDOW", self._close_dialog)
 
         ttk.Label(dialog, text="开始日期 (YYYY-MM-DD)").pack(anchor="w", padx=16, pady=(16, 4))
-        start_entry = ttk.Entry(dialog, textvariable=start_var)
-        start_entry.pack(fill="x", padx=16)
-        start_entry.focus_set()
+        self._dialog_start_entry = ttk.Entry(dialog, textvariable=self._dialog_start_var)
+        self._dialog_start_entry.pack(fill="x", padx=16)
 
         ttk.Label(dialog, text="结束日期 (可选)").pack(anchor="w", padx=16, pady=(12, 4))
-        end_entry = ttk.Entry(dialog, textvariable=end_var)
-        end_entry.pack(fill="x", padx=16)
-
-        def commit() -> None:
-            start = start_var.get().strip()
-            end = end_var.get().strip()
-            if not start:
-                messagebox.showerror("日期无效", "请填写开始日期", parent=dialog)
-                return
-            if not self._validate_date(start):
-                messagebox.showerror("日期无效", "日期格式需为 YYYY-MM-DD", parent=dialog)
-                return
-            token = start
-            if end:
-                if not self._validate_date(end):
-                    messagebox.showerror("日期无效", "结束日期格式需为 YYYY-MM-DD", parent=dialog)
-                    return
-                token = f"{start}~{end}"
-            if token not in self._segments:
-                self._segments.append(token)
-                self._render_segments()
-                if self._on_change:
-                    self._on_change()
-            dialog.destroy()
-
-        ttk.Button(dialog, text="添加", command=commit, style="Primary.TButton").pack(
+        ttk.Entry(dialog, textvariable=self._dialog_end_var).pack(fill="x", padx=16)
+
+        ttk.Button(dialog, text="添加", command=self._commit_dialog, style="Primary.TButton").pack(
             side="left", padx=(16, 8), pady=24
         )
-        ttk.Button(dialog, text="取消", command=dialog.destroy).pack(
+        ttk.Button(dialog, text="取消", command=self._close_dialog).pack(
             side="right", padx=(8, 16), pady=24
         )
+        return dialog
+
+    def _close_dialog(self) -> None:
+        if self._dialog is not None:
+            self._dialog.grab_release()
+            self._dialog.withdraw()
+
+    def _commit_dialog(self) -> None:
+        dialog = self._dialog
+        start = self._dialog_start_var.get().strip()
+        end = self._dialog_end_var.get().strip()
+        if not start:
+            messagebox.showerror("日期无效", "请填写开始日期", parent=dialog)
+            return
+        if not self._validate_date(start):
+            messagebox.showerror("日期无效", "日期格式需为 YYYY-MM-DD", parent=dialog)
+            return
+        token = start
+        if end:
+            if not self._validate_date(end):
+                messagebox.showerror("日期无效", "结束日期格式需为 YYYY-MM-DD", parent=dialog)
+                return
+            token = f"{start}~{end}"
+        if token not in self._segment_set:
+            self._segments.append(token)
+            self._segment_set.add(token)
+            self._render_segments()
+            if self._on_change:
+                self._on_change()
+        self._close_dialog()
 
     @staticmethod
     def _validate_date(value: str) -> bool:
-        if len(value) != 10:
-            return False
-        try:
-            dt.datetime.strptime(value, "%Y-%m-%d")
-        except ValueError:
-            return False
-        return True
+        return _is_iso_date(value)
 
     def _render_segments(self) -> None:
-        for child in list(self._chips.winfo_children()):
-            child.destroy()
-        if not self._segments:
-            ttk.Label(self._chips, text="尚未选择日期", style="Hint.TLabel").grid(
-                row=0, column=0, sticky="w"
-            )
-            return
-        for idx, token in enumerate(self._segments):
-            chip = ttk.Frame(self._chips, style="Tag.TFrame")
-            chip.grid(row=idx // 2, column=idx % 2, padx=(0, 8), pady=(0, 8), sticky="w")
-            ttk.Label(chip, text=token, style="Tag.TLabel").pack(side="left", padx=(8, 4))
-            ttk.Button(
-                chip,
-                text="✕",
-                width=2,
-                command=lambda value=token: self.remove(value),
-            ).pack(side="right", padx=(0, 6))
+        self._chip_flow.sync(self._segments, self._segment_set)
 
     def remove(self, token: str) -> None:
-        if token in self._segments:
+        if token in self._segment_set:
             self._segments.remove(token)
+            self._segment_set.discard(token)
             self._render_segments()
             if self._on_change:
                 self._on_change()
@@ -313,7 +622,8 @@ class DateRangePicker(ttk.Frame):
         return list(self._segments)
 
     def set_tokens(self, values: Iterable[str]) -> None:
-        self._segments = [str(v).strip() for v in values if str(v).strip()]
+        self._segments = [text for v in values if (text := str(v).strip())]
+        self._segment_set = set(self._segments)
         self._render_segments()
         if self._on_change:
             self._on_change()
@@ -322,17 +632,50 @@ class DateRangePicker(ttk.Frame):
 class VisualApp(tk.Tk):
     def __init__(self) -> None:
         super().__init__()
+        _install_output_routing()
         self.title("预约任务控制台（示例数据）")
         self.geometry("1200x760")
         self.minsize(1024, 680)
 
-        self.log_queue: "queue.Queue[tuple[str, object]]" = queue.Queue()
+        # 后台线程只 append、Tk 线程只 popleft，deque 的这两个操作本身线程安全，无需加锁
+        self.log_queue: "collections.deque[tuple[str, object]]" = collections.deque()
         self._is_running = False
+        self._busy_shown = False
         self._current_theme = "light"
-        self._log_records: List[Dict[str, object]] = []
-        self._history: List[Dict[str, object]] = []
+        self._applied_theme: Optional[str] = None
+        # 环形缓冲：超过 _LOG_MAX_LINES 时 deque 自动丢弃最旧的记录
+        self._log_records: "collections.deque[LogRecord]" = collections.deque(
+            maxlen=_LOG_MAX_LINES
+        )
+        # 按级别分桶的日志，以及按 (筛选级别, 是否显示敏感信息) 缓存的渲染文本
+        self._log_by_level: Dict[str, "collections.deque[LogRecord]"] = {
+            "INFO": collections.deque(),
+            "WARN": collections.deque(),
+            "ERROR": collections.deque(),
+        }
+        self._rendered_log_cache: Dict[Tuple[str, bool], str] = {}
+        self._last_rendered_index = 0
+        self._history: "collections.deque[Dict[str, object]]" = collections.deque(
+            maxlen=_HISTORY_MAX_ROWS
+        )
+        self._history_pending: List[Dict[str, object]] = []
+        self._history_flush_id: Optional[str] = None
         self._current_run_started: Optional[dt.datetime] = None
         self._side_visible = False
+        self._preview_after_id: Optional[str] = None
+        self._sanitize_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sanitize")
+        self._preview_inflight = False
+        self._preview_pending: Optional[Dict[str, object]] = None
+        self._preview_fingerprint: Optional[Tuple[object, ...]] = None
+        self._suppress_refresh = 0
+        self._cookie_cache = ""
+        self._cookie_dirty = False
+        self._validated_cookie = ""
+        self._idle_status = ""
+        self._last_concurrency = 1
+        self._preview_snapshot = ""
+        self._side_tabs_built = False
+        self._log_tab_built = False
 
         self.style = ttk.Style(self)
         try:
@@ -435,7 +778,7 @@ class VisualApp(tk.Tk):
         self.side_panel.columnconfigure(0, weight=1)
         self.side_panel.rowconfigure(1, weight=1)
         self.side_panel.grid_remove()
-        self._build_side_panel(self.side_panel)
+        self._build_side_panel_shell(self.side_panel)
 
     def _create_card(
         self, parent: ttk.Frame, *, title: str, description: str, row: int
@@ -491,10 +834,10 @@ class VisualApp(tk.Tk):
         )
         self.cookie_text = scrolledtext.ScrolledText(card, height=6, wrap=tk.WORD)
         self.cookie_text.grid(row=6, column=1, sticky="ew")
-        self.cookie_text.insert("1.0", "")
         self.cookie_validation = ValidationMessage(card)
         self.cookie_validation.grid(row=7, column=1, sticky="ew", pady=(4, 0))
-        self.cookie_text.bind("<KeyRelease>", lambda _event: self._refresh_preview())
+        # 只在内容变化时标记 Cookie 缓存失效，避免每次校验都从 Tcl 拷贝整段文本
+        self.cookie_text.bind("<<Modified>>", self._on_cookie_modified)
 
     def _build_task_section(self, parent: ttk.Frame) -> None:
         card = self._create_card(
@@ -682,13 +1025,26 @@ class VisualApp(tk.Tk):
         self.status_chip = ttk.Label(card, text="准备就绪", style="CardSubtitle.TLabel")
         self.status_chip.grid(row=6, column=0, sticky="w", pady=(12, 0))
 
-    def _build_side_panel(self, parent: ttk.Frame) -> None:
+    def _build_side_panel_shell(self, parent: ttk.Frame) -> None:
         ttk.Label(parent, text="预览 / 日志 / 历史", style="CardTitle.TLabel").grid(
             row=0, column=0, sticky="w"
         )
         self.side_notebook = ttk.Notebook(parent)
         self.side_notebook.grid(row=1, column=0, sticky="nsew", pady=(12, 0))
 
+    def _ensure_side_tabs(self) -> None:
+        # 侧边面板默认收起，各标签页在第一次展开时才创建
+        if self._side_tabs_built:
+            return
+        self._side_tabs_built = True
+        self._build_side_tabs()
+        self._apply_text_widget_theme()
+        if self._preview_snapshot:
+            self._write_preview(self._preview_snapshot)
+        self._history_pending.clear()
+        self._insert_history_rows(self._history)
+
+    def _build_side_tabs(self) -> None:
         preview_tab = ttk.Frame(self.side_notebook)
         preview_tab.columnconfigure(0, weight=1)
         self.preview_text = scrolledtext.ScrolledText(preview_tab, height=12, wrap=tk.WORD)
@@ -696,30 +1052,11 @@ class VisualApp(tk.Tk):
         self.preview_text.configure(state="disabled")
         self.side_notebook.add(preview_tab, text="预览")
 
-        log_tab = ttk.Frame(self.side_notebook)
-        log_tab.columnconfigure(0, weight=1)
-        toolbar = ttk.Frame(log_tab)
-        toolbar.grid(row=0, column=0, sticky="ew")
-        ttk.Label(toolbar, text="级别筛选", style="FormLabel.TLabel").pack(side="left")
-        self.log_filter_var = tk.StringVar(value="全部")
-        self.log_filter = ttk.Combobox(
-            toolbar,
-            textvariable=self.log_filter_var,
-            values=["全部", "INFO", "WARN", "ERROR"],
-            state="readonly",
-            width=8,
-        )
-        self.log_filter.pack(side="left", padx=(12, 0))
-        self.log_filter.bind("<<ComboboxSelected>>", lambda _event: self._refresh_log_display())
-        self.clear_log_button = ttk.Button(
-            toolbar, text="清除日志", command=self._clear_log
-        )
-        self.clear_log_button.pack(side="right")
-
-        self.log_text = scrolledtext.ScrolledText(log_tab, height=14, wrap=tk.WORD)
-        self.log_text.grid(row=1, column=0, sticky="nsew", pady=(8, 0))
-        self.log_text.configure(state="disabled")
-        self.side_notebook.add(log_tab, text="日志")
+        # 日志页内容较重，等第一次切换到该页时再创建
+        self._log_tab = ttk.Frame(self.side_notebook)
+        self._log_tab.columnconfigure(0, weight=1)
+        self.side_notebook.add(self._log_tab, text="日志")
+        self.side_notebook.bind("<<NotebookTabChanged>>", self._on_side_tab_changed)
 
         history_tab = ttk.Frame(self.side_notebook)
         history_tab.columnconfigure(0, weight=1)
@@ -752,12 +1089,43 @@ class VisualApp(tk.Tk):
         )
         self.side_notebook.add(help_tab, text="操作说明")
 
+    def _on_side_tab_changed(self, _event: tk.Event) -> None:
+        if not self._log_tab_built and self.side_notebook.select() == str(self._log_tab):
+            self._build_log_tab()
+
+    def _build_log_tab(self) -> None:
+        self._log_tab_built = True
+        toolbar = ttk.Frame(self._log_tab)
+        toolbar.grid(row=0, column=0, sticky="ew")
+        ttk.Label(toolbar, text="级别筛选", style="FormLabel.TLabel").pack(side="left")
+        self.log_filter_var = tk.StringVar(value="全部")
+        self.log_filter = ttk.Combobox(
+            toolbar,
+            textvariable=self.log_filter_var,
+            values=["全部", "INFO", "WARN", "ERROR"],
+            state="readonly",
+            width=8,
+        )
+        self.log_filter.pack(side="left", padx=(12, 0))
+        self.log_filter.bind("<<ComboboxSelected>>", lambda _event: self._refresh_log_display())
+        self.clear_log_button = ttk.Button(
+            toolbar, text="清除日志", command=self._clear_log
+        )
+        self.clear_log_button.pack(side="right")
+
+        self.log_text = scrolledtext.ScrolledText(self._log_tab, height=14, wrap=tk.WORD)
+        self.log_text.grid(row=1, column=0, sticky="nsew", pady=(8, 0))
+        self.log_text.configure(state="disabled")
+        self._apply_text_widget_theme()
+        self._refresh_log_display()
+
     # ------------------------------------------------------------------
     # Interactivity helpers
     # ------------------------------------------------------------------
     def _toggle_side_panel(self) -> None:
         self._side_visible = not self._side_visible
         if self._side_visible:
+            self._ensure_side_tabs()
             self.side_panel.grid()
             self.side_toggle_button.configure(text="收起预览面板")
         else:
@@ -771,104 +1139,31 @@ class VisualApp(tk.Tk):
 
     def _apply_theme(self, theme: str) -> None:
         self._current_theme = theme
+        # 样式表按主题预先生成；重复应用同一主题时无需再次下发 Tcl 调用
+        if theme == self._applied_theme:
+            return
+        self._applied_theme = theme
         palette = _THEME_MAP.get(theme, _THEME_MAP["light"])
+        plan = _THEME_STYLE_PLAN.get(theme, _THEME_STYLE_PLAN["light"])
 
         self.configure(bg=palette["bg"])
-        self.style.configure("TFrame", background=palette["bg"])
-        self.style.configure("Title.TLabel", background=palette["bg"], foreground=palette["text"])
-        self.style.configure(
-            "Subtitle.TLabel", background=palette["bg"], foreground=palette["text-muted"]
-        )
-        self.style.configure(
-            "CardTitle.TLabel", background=palette["bg"], foreground=palette["text"]
-        )
-        self.style.configure(
-            "CardSubtitle.TLabel", background=palette["bg"], foreground=palette["text-muted"]
-        )
-        self.style.configure(
-            "FormLabel.TLabel", background=palette["bg"], foreground=palette["text"]
-        )
-        self.style.configure("Hint.TLabel", background=palette["bg"], foreground=palette["text-muted"])
-        self.style.configure(
-            "Placeholder.TLabel", background=palette["bg"], foreground=palette["text-muted"]
-        )
-        self.style.configure(
-            "Validation.Info.TLabel",
-            background=palette["bg"],
-            foreground=palette["text-muted"],
-        )
-        self.style.configure(
-            "Validation.Error.TLabel",
-            background=palette["bg"],
-            foreground=palette["danger"],
-        )
-        self.style.configure(
-            "Validation.Success.TLabel",
-            background=palette["bg"],
-            foreground=palette["success"],
-        )
-        self.style.configure(
-            "Card.TFrame",
-            background=palette["bg-elev"],
-            relief="flat",
-            borderwidth=0,
-        )
-        self.style.configure(
-            "Tag.TFrame",
-            background=palette["bg-elev"],
-            relief="solid",
-            bordercolor=palette["border"],
-        )
-        self.style.configure(
-            "Tag.TLabel", background=palette["bg-elev"], foreground=palette["text"]
-        )
-        self.style.configure(
-            "Primary.TButton",
-            background=palette["primary"],
-            foreground="#ffffff",
-            focusthickness=3,
-            focuscolor=palette["focus"],
-            bordercolor=palette["primary"],
-        )
-        self.style.map(
-            "Primary.TButton",
-            background=[
-                ("pressed", palette["primary-active"]),
-                ("active", palette["primary-active"]),
-                ("!disabled", palette["primary"]),
-            ],
-            foreground=[("disabled", palette["text-muted"]), ("!disabled", "#ffffff")],
-        )
-        self.style.configure(
-            "TButton",
-            background=palette["bg-elev"],
-            foreground=palette["text"],
-            bordercolor=palette["border"],
-        )
-        self.style.map(
-            "TButton",
-            background=[("pressed", palette["border"]), ("active", palette["focus"])],
-            foreground=[("disabled", palette["text-muted"]), ("!disabled", palette["text"])],
-        )
-        self.style.configure(
-            "Horizontal.TProgressbar",
-            background=palette["primary"],
-            troughcolor=palette["bg-elev"],
-            bordercolor=palette["border"],
-        )
+        for name, options in plan.configure:
+            self.style.configure(name, **options)
+        for name, options in plan.maps:
+            self.style.map(name, **options)
         self.theme_toggle.configure(
             text="切换至浅色模式" if theme == "dark" else "切换至深色模式"
         )
 
-        for widget in (self.preview_text, self.log_text):
-            widget.configure(
-                background=palette["bg-elev"],
-                foreground=palette["text"],
-                insertbackground=palette["primary"],
-                highlightthickness=1,
-                highlightbackground=palette["border"],
-                highlightcolor=palette["focus"],
-            )
+        self._apply_text_widget_theme()
+
+    def _apply_text_widget_theme(self) -> None:
+        if not self._side_tabs_built:
+            return
+        plan = _THEME_STYLE_PLAN.get(self._current_theme, _THEME_STYLE_PLAN["light"])
+        self.preview_text.configure(**plan.text_widget)
+        if self._log_tab_built:
+            self.log_text.configure(**plan.text_widget)
 
     def _update_delay_display(self) -> None:
         low = max(1, int(self.delay_low_var.get() or 1))
@@ -879,11 +1174,15 @@ class VisualApp(tk.Tk):
         self._refresh_preview()
 
     def _on_concurrency_changed(self, value: str) -> None:  # pragma: no cover - UI side-effect
+        # 拖动时每个像素都会回调，只在取整后的值变化时更新
         try:
-            current = int(float(value))
+            current = int(float(value) + 0.5)
         except ValueError:
             current = 1
         current = max(1, min(5, current))
+        if current == self._last_concurrency:
+            return
+        self._last_concurrency = current
         self.concurrency_var.set(current)
         self.concurrency_label.configure(text=f"并发：{current}")
         self._refresh_preview()
@@ -904,39 +1203,108 @@ class VisualApp(tk.Tk):
         self._refresh_log_display()
 
     def _fill_examples(self) -> None:
-        self.account_name_var.set("demo_account")
-        self.shop_id_var.set("SHOP_0001")
-        self.cookie_text.delete("1.0", tk.END)
-        self.cookie_text.insert("1.0", EXAMPLE_COOKIE)
-        self.preferred_tags.set_tags(["尊享卡"])
-        self.title_tags.set_tags(["瑜伽", "普拉提"])
-        self.time_tags.set_tags(["18:00-19:00", "20:00-21:00"])
-        self.date_picker.set_tokens(["2025-05-01~2025-05-03"])
-        self.max_attempts_var.set(2)
-        self.delay_low_var.set(120)
-        self.delay_high_var.set(240)
-        self.concurrency_scale.set(1)
-        self.global_timeout_var.set("60000")
-        self.log_json_var.set(True)
-        self._update_delay_display()
-        self._refresh_preview()
+        # 逐项赋值期间屏蔽各控件触发的预览刷新，填完后统一刷新一次
+        self._suppress_refresh += 1
+        try:
+            self.account_name_var.set("demo_account")
+            self.shop_id_var.set("SHOP_0001")
+            self.cookie_text.delete("1.0", tk.END)
+            self.cookie_text.insert("1.0", EXAMPLE_COOKIE)
+            self._cookie_dirty = True
+            self.preferred_tags.set_tags(["尊享卡"])
+            self.title_tags.set_tags(["瑜伽", "普拉提"])
+            self.time_tags.set_tags(["18:00-19:00", "20:00-21:00"])
+            self.date_picker.set_tokens(["2025-05-01~2025-05-03"])
+            self.max_attempts_var.set(2)
+            self.delay_low_var.set(120)
+            self.delay_high_var.set(240)
+            self.concurrency_scale.set(1)
+            self.global_timeout_var.set("60000")
+            self.log_json_var.set(True)
+            self._update_delay_display()
+        finally:
+            self._suppress_refresh -= 1
+        self._do_refresh_preview()
 
     def _refresh_preview(self) -> None:
+        if self._suppress_refresh:
+            return
+        # 连续输入时只在最后一次变化 200ms 后刷新预览
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.after(_PREVIEW_DEBOUNCE_MS, self._do_refresh_preview)
+
+    def _do_refresh_preview(self) -> None:
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+            self._preview_after_id = None
+        # 输入与上次完全一致时（重复输入、来回勾选）跳过整轮预览生成
+        fingerprint = self._preview_inputs()
+        if fingerprint == self._preview_fingerprint:
+            self._validate_form()
+            return
+        self._preview_fingerprint = fingerprint
         payload = self._collect_preview_payload()
-        preview = sanitise_and_dump_json(payload)
+        # 脱敏与序列化在后台线程进行；已有任务在跑时只保留最新一份待处理
+        if self._preview_inflight:
+            self._preview_pending = payload
+        else:
+            self._submit_preview(payload)
+        self._validate_form()
+
+    def _submit_preview(self, payload: Dict[str, object]) -> None:
+        self._preview_inflight = True
+        future = self._sanitize_pool.submit(_render_preview, payload)
+        future.add_done_callback(self._on_preview_rendered)
+
+    def _on_preview_rendered(self, future: "Future[str]") -> None:  # pragma: no cover - worker thread
+        try:
+            preview = future.result()
+        except Exception as exc:
+            preview = f"预览生成失败：{exc}"
+        self.log_queue.append(("preview", preview))
+
+    def _show_preview(self, preview: str) -> None:
+        self._preview_inflight = False
+        # 内容未变化时不重写文本框
+        if preview != self._preview_snapshot:
+            self._preview_snapshot = preview
+            if self._side_tabs_built:
+                self._write_preview(preview)
+        if self._preview_pending is not None:
+            pending, self._preview_pending = self._preview_pending, None
+            self._submit_preview(pending)
+
+    def _write_preview(self, preview: str) -> None:
         self.preview_text.configure(state="normal")
         self.preview_text.delete("1.0", tk.END)
         self.preview_text.insert("1.0", preview)
         self.preview_text.configure(state="disabled")
-        self._validate_form()
+
+    def _preview_inputs(self) -> Tuple[object, ...]:
+        return (
+            self.account_name_var.get(),
+            self.shop_id_var.get(),
+            tuple(self.preferred_tags.get_tags()),
+            tuple(self.title_tags.get_tags()),
+            tuple(self.time_tags.get_tags()),
+            tuple(self.date_picker.get_tokens()),
+            self.max_attempts_var.get(),
+            self.delay_low_var.get(),
+            self.delay_high_var.get(),
+            self.concurrency_var.get(),
+            self.global_timeout_var.get(),
+            self.strict_var.get(),
+            self.allow_fallback_var.get(),
+            self.log_json_var.get(),
+        )
 
     def _collect_preview_payload(self) -> Dict[str, object]:
         shop_id = self.shop_id_var.get().strip() or DEFAULT_SHOP_ID
-        masked_shop = mask_identifier(shop_id, placeholder="SHOP")
         account_name = self.account_name_var.get().strip() or "account"
         payload = {
-            "shop_id": masked_shop,
-            "account": mask_identifier(account_name, placeholder="ACCOUNT"),
+            "shop_id": shop_id,
+            "account": account_name,
             "preferred_cards": self.preferred_tags.get_tags(),
             "title_keywords": self.title_tags.get_tags(),
             "time_keywords": self.time_tags.get_tags(),
@@ -949,7 +1317,7 @@ class VisualApp(tk.Tk):
             "global_timeout_ms": self.global_timeout_var.get().strip() or None,
             "log_json": bool(self.log_json_var.get()),
         }
-        return sanitize_payload(payload)
+        return payload
 
     def _validate_form(self) -> None:
         self.account_validation.clear()
@@ -970,7 +1338,8 @@ class VisualApp(tk.Tk):
         else:
             self.shop_validation.show("shop_id 格式有效。", kind="success")
 
-        if not self.cookie_text.get("1.0", tk.END).strip():
+        self._validated_cookie = self._read_cookie()
+        if not self._validated_cookie:
             self.cookie_validation.show("Cookie 不能为空。", kind="error")
         else:
             self.cookie_validation.show("Cookie 已填写（仅本地使用）。", kind="success")
@@ -987,36 +1356,103 @@ class VisualApp(tk.Tk):
         if not text:
             return
         lines = text.splitlines(True)
+        evicted: List[LogRecord] = []
+        # 同一批到达的日志共用一个时间戳（精度本就只到秒）
+        ts = dt.datetime.now().isoformat(timespec="seconds")
         for raw_line in lines:
             level = self._detect_level(raw_line)
-            record = {
-                "level": level,
-                "raw": raw_line,
-                "sanitized": sanitize_text(raw_line),
-                "ts": dt.datetime.now().isoformat(timespec="seconds"),
-            }
+            record = LogRecord(
+                level=level,
+                raw=raw_line,
+                ts=ts,
+            )
+            if len(self._log_records) == _LOG_MAX_LINES:
+                oldest = self._log_records[0]
+                self._log_by_level[oldest.level].popleft()
+                evicted.append(oldest)
             self._log_records.append(record)
-        self._refresh_log_display()
+            self._log_by_level[level].append(record)
+        if evicted:
+            self._trim_log_records(evicted)
+        self._rendered_log_cache.clear()
+        self._render_new_records()
+
+    def _trim_log_records(self, evicted: Sequence[LogRecord]) -> None:
+        # 被环形缓冲挤掉的记录中，最前面 _last_rendered_index 条已经显示在日志框里
+        rendered = min(len(evicted), self._last_rendered_index)
+        if rendered:
+            self._drop_rendered_records(evicted[:rendered])
+            self._last_rendered_index -= rendered
 
     @staticmethod
     def _detect_level(line: str) -> str:
-        upper = line.upper()
-        if "[ERROR" in upper or "ERROR" in upper:
+        match = _LEVEL_RE.search(line)
+        if match is None:
+            return "INFO"
+        if match.group(1) or _ERROR_LEVEL_RE.search(line, match.end()):
             return "ERROR"
-        if "[WARN" in upper or "WARNING" in upper:
-            return "WARN"
-        return "INFO"
+        return "WARN"
 
-    def _refresh_log_display(self) -> None:
+    def _log_view_filter(self) -> Tuple[Optional[str], bool]:
+        target_level = self.log_filter_var.get()
+        show_sensitive = bool(self.show_sensitive_var.get())
+        return (None if target_level == "全部" else target_level), show_sensitive
+
+    def _render_new_records(self) -> None:
+        # 只把上次渲染之后新增的记录追加到日志框，整表重建留给筛选/脱敏切换
+        if not self._log_tab_built:
+            return
+        level, show_sensitive = self._log_view_filter()
+        text = "".join(
+            record.display(show_sensitive)
+            for record in itertools.islice(self._log_records, self._last_rendered_index, None)
+            if level is None or record.level == level
+        )
+        self._last_rendered_index = len(self._log_records)
+        if not text:
+            return
+        # 仅当视图停在底部时才跟随滚动，用户向上翻看时保持原位置
+        pinned = self.log_text.yview()[1] >= 0.999
         self.log_text.configure(state="normal")
-        self.log_text.delete("1.0", tk.END)
+        self.log_text.insert(tk.END, text)
+        if pinned:
+            self.log_text.see(tk.END)
+        self.log_text.configure(state="disabled")
+
+    def _drop_rendered_records(self, records: Iterable[LogRecord]) -> None:
+        # 被裁掉的旧记录若已显示，按字符数从日志框开头删除对应内容
+        if not self._log_tab_built:
+            return
+        level, show_sensitive = self._log_view_filter()
+        chars = sum(
+            len(record.display(show_sensitive))
+            for record in records
+            if level is None or record.level == level
+        )
+        if not chars:
+            return
+        self.log_text.configure(state="normal")
+        self.log_text.delete("1.0", f"1.0 + {chars} chars")
+        self.log_text.configure(state="disabled")
+
+    def _refresh_log_display(self) -> None:
+        if not self._log_tab_built:
+            return
+        self._last_rendered_index = len(self._log_records)
         target_level = self.log_filter_var.get()
         show_sensitive = bool(self.show_sensitive_var.get())
-        for record in self._log_records:
-            if target_level != "全部" and record["level"] != target_level:
-                continue
-            line = record["raw"] if show_sensitive else record["sanitized"]
-            self.log_text.insert(tk.END, line)
+        cache_key = (target_level, show_sensitive)
+        text = self._rendered_log_cache.get(cache_key)
+        if text is None:
+            if target_level == "全部":
+                records = self._log_records
+            else:
+                records = self._log_by_level.get(target_level, [])
+            text = "".join(record.display(show_sensitive) for record in records)
+            self._rendered_log_cache[cache_key] = text
+        self.log_text.configure(state="normal")
+        self.log_text.delete("1.0", tk.END)
+        self.log_text.insert(tk.END, text)
         self.log_text.see(tk.END)
         self.log_text.configure(state="disabled")
 
@@ -1031,6 +1467,10 @@ class VisualApp(tk.Tk):
         if not confirm:
             return
         self._log_records.clear()
+        for bucket in self._log_by_level.values():
+            bucket.clear()
+        self._rendered_log_cache.clear()
+        self._last_rendered_index = 0
         self._refresh_log_display()
 
     def _export_desensitised_log(self) -> None:
@@ -1045,70 +1485,129 @@ class VisualApp(tk.Tk):
         )
         if not file_path:
             return
-        payload = {
-            "exported_at": dt.datetime.now().isoformat(),
-            "records": [
-                {
-                    "ts": record["ts"],
-                    "level": record["level"],
-                    "message": record["sanitized"],
-                }
-                for record in self._log_records
-            ],
-        }
-        Path(file_path).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        exported_at = json.dumps(dt.datetime.now().isoformat())
+        # 逐条写出记录，不在内存中拼出整份记录列表
+        with open(file_path, "w", encoding="utf-8") as handle:
+            handle.write(f'{{\n  "exported_at": {exported_at},\n  "records": [')
+            separator = "\n    "
+            for record in self._log_records:
+                handle.write(separator)
+                handle.write(
+                    json.dumps(
+                        {"ts": record.ts, "level": record.level, "message": sanitize_text(record.raw)},
+                        ensure_ascii=False,
+                    )
+                )
+                separator = ",\n    "
+            handle.write("\n  ]\n}\n")
         messagebox.showinfo("导出完成", "日志已脱敏并导出。", parent=self)
 
     def _record_history(self, payload: Dict[str, object]) -> None:
         self._history.append(payload)
-        started = payload.get("started")
-        duration = payload.get("duration")
-        result = payload.get("result")
-        self.history_tree.insert(
-            "",
-            tk.END,
-            values=(started or "--", duration or "--", result or "--"),
-        )
+        self._history_pending.append(payload)
+        # 历史表格每 500ms 批量写入一次
+        if self._history_flush_id is None:
+            self._history_flush_id = self.after(_HISTORY_FLUSH_MS, self._flush_history)
+
+    def _flush_history(self) -> None:
+        self._history_flush_id = None
+        pending, self._history_pending = self._history_pending, []
+        if self._side_tabs_built:
+            self._insert_history_rows(pending)
+
+    def _insert_history_rows(self, rows: Iterable[Dict[str, object]]) -> None:
+        for payload in rows:
+            self.history_tree.insert(
+                "",
+                tk.END,
+                values=(
+                    payload.get("started") or "--",
+                    payload.get("duration") or "--",
+                    payload.get("result") or "--",
+                ),
+            )
+        # 与 self._history 保持同样的上限，丢弃最早的行
+        children = self.history_tree.get_children()
+        if len(children) > _HISTORY_MAX_ROWS:
+            self.history_tree.delete(*children[: len(children) - _HISTORY_MAX_ROWS])
 
     def _show_busy(self) -> None:
+        # 轮询每一轮都会调用，只在显示状态切换时才发出 Tk 调用
+        if self._busy_shown:
+            return
+        self._busy_shown = True
         self.busy_indicator.grid()
         self.busy_indicator.start(8)
 
     def _hide_busy(self) -> None:
+        if not self._busy_shown:
+            return
+        self._busy_shown = False
         self.busy_indicator.stop()
         self.busy_indicator.grid_remove()
 
     def _poll_log_queue(self) -> None:
+        updated = self._process_log_queue()
+        if self._is_running:
+            self._show_busy()
+        elif not updated:
+            self._hide_busy()
+        # 有消息时加快轮询，空闲时放慢以减少唤醒
+        self.after(_POLL_ACTIVE_MS if updated else _POLL_IDLE_MS, self._poll_log_queue)
+
+    def _process_log_queue(self) -> bool:
         updated = False
-        while True:
-            try:
-                kind, payload = self.log_queue.get_nowait()
-            except queue.Empty:
-                break
+        log_chunks: List[str] = []
+        for kind, payload in self._drain_log_queue():
             updated = True
             if kind == "log":
-                self._append_log(str(payload))
-            elif kind == "done":
-                success, message = payload  # type: ignore[assignment]
-                self._append_log(f"\n--- {message} ---\n")
-                self._is_running = False
-                self.run_button.state(["!disabled"])
-                self._hide_busy()
-                self.status_chip.configure(text=message)
-                if success:
-                    messagebox.showinfo("任务完成", message, parent=self)
-                else:
-                    messagebox.showwarning("任务完成", message, parent=self)
+                log_chunks.append(str(payload))
             elif kind == "history":
                 self._record_history(payload)  # type: ignore[arg-type]
-        if self._is_running:
-            self._show_busy()
-        elif not updated:
-            self._hide_busy()
-        self.after(160, self._poll_log_queue)
+            elif kind == "preview":
+                self._show_preview(str(payload))
+        # 本轮取出的日志合并后只写一次日志框
+        if log_chunks:
+            self._append_log("".join(log_chunks))
+        return updated
+
+    def _on_worker_done(self, success: bool, message: str) -> None:
+        # 由工作线程通过 after(0) 投递；先处理完队列里剩余的日志与历史，保证结束标记在最后
+        while self.log_queue:
+            self._process_log_queue()
+        self._append_log(f"\n--- {message} ---\n")
+        self._finish_run(success, message)
+
+    def _drain_log_queue(self) -> List[Tuple[str, object]]:
+        # 单次最多处理 _POLL_BATCH_LIMIT 条，避免大量输出时阻塞界面；
+        # Tk 线程是唯一的消费者，按当前长度取出不会遇到空队列
+        log_queue = self.log_queue
+        count = min(len(log_queue), _POLL_BATCH_LIMIT)
+        return [log_queue.popleft() for _ in range(count)]
+
+    def _finish_run(self, success: bool, message: str) -> None:
+        self._is_running = False
+        self.run_button.state(["!disabled"])
+        self._hide_busy()
+        self.status_chip.configure(text=message)
+        if success:
+            messagebox.showinfo("任务完成", message, parent=self)
+        else:
+            messagebox.showwarning("任务完成", message, parent=self)
+
+    def _on_cookie_modified(self, _event: tk.Event) -> None:
+        if not self.cookie_text.edit_modified():
+            return
+        # 重置修改标记，下一次编辑才会再次触发 <<Modified>>
+        self.cookie_text.edit_modified(False)
+        self._cookie_dirty = True
+        self._refresh_preview()
 
     def _read_cookie(self) -> str:
-        return self.cookie_text.get("1.0", tk.END).strip()
+        if self._cookie_dirty:
+            self._cookie_cache = self.cookie_text.get("1.0", tk.END).strip()
+            self._cookie_dirty = False
+        return self._cookie_cache
 
     def _build_tasks(
         self,
@@ -1120,7 +1619,6 @@ class VisualApp(tk.Tk):
         max_attempts: int,
         delay_ms: Tuple[int, int],
     ) -> List[TaskConfig]:
-        tasks: List[TaskConfig] = []
         base = TaskConfig(
             title_keywords=list(title_keywords),
             time_keywords=list(time_keywords),
@@ -1130,72 +1628,80 @@ class VisualApp(tk.Tk):
             delay_ms=delay_ms,
         )
         if not dates:
-            tasks.append(base)
-        else:
-            for date in dates:
-                task = TaskConfig(
-                    title_keywords=list(title_keywords),
-                    time_keywords=list(time_keywords),
-                    date=date,
-                    strict_match=strict_match,
-                    allow_fallback=allow_fallback,
-                    max_attempts=max_attempts,
-                    delay_ms=delay_ms,
-                )
-                tasks.append(task)
-        return tasks
+            return [base]
+        # 各日期的任务共用同一份关键字列表，执行时只读不改
+        return [replace(base, date=date) for date in dates]
+
+    def _snapshot_form(self) -> _FormSnapshot:
+        # 在 Tk 线程读取控件状态，解析与校验交给工作线程。Cookie 复用最近一次校验的值，
+        # 校验后又有编辑（防抖尚未触发）时先补一次校验
+        if self._cookie_dirty:
+            self._validate_form()
+        return _FormSnapshot(
+            cookie=self._validated_cookie,
+            account_name=self.account_name_var.get(),
+            shop_id=self.shop_id_var.get(),
+            preferred_cards=self.preferred_tags.get_tags(),
+            title_keywords=self.title_tags.get_tags(),
+            time_keywords=self.time_tags.get_tags(),
+            date_tokens=self.date_picker.get_tokens(),
+            max_attempts=self.max_attempts_var.get(),
+            delay_low=self.delay_low_var.get(),
+            delay_high=self.delay_high_var.get(),
+            strict_match=bool(self.strict_var.get()),
+            allow_fallback=bool(self.allow_fallback_var.get()),
+            global_timeout=self.global_timeout_var.get(),
+            concurrency=self.concurrency_var.get(),
+            log_json=bool(self.log_json_var.get()),
+        )
 
-    def _build_config(self) -> AppConfig:
-        cookie = self._read_cookie()
+    def _build_config_from_snapshot(self, form: _FormSnapshot) -> AppConfig:
+        cookie = form.cookie
         if not cookie:
             raise ValueError("Cookie 不能为空。")
 
-        title_keywords = self.title_tags.get_tags()
-        time_keywords = self.time_tags.get_tags()
+        title_keywords = form.title_keywords
+        time_keywords = form.time_keywords
         if not title_keywords and not time_keywords:
             raise ValueError("请至少填写课程标题或时段关键字。")
 
-        preferred_cards = self.preferred_tags.get_tags()
-        date_tokens = self.date_picker.get_tokens()
-        date_value = "\n".join(date_tokens)
+        date_value = "\n".join(form.date_tokens)
         dates = parse_date_list(date_value) if date_value else []
 
-        max_attempts = max(1, int(self.max_attempts_var.get() or 1))
+        max_attempts = max(1, int(form.max_attempts or 1))
         try:
-            delay = parse_delay(f"{self.delay_low_var.get()},{self.delay_high_var.get()}")
+            delay = parse_delay(f"{form.delay_low},{form.delay_high}")
         except ValueError as exc:
             raise ValueError(str(exc))
         if not delay:
             delay = (120, 300)
 
-        strict_match = bool(self.strict_var.get())
-        allow_fallback = bool(self.allow_fallback_var.get())
-
-        shop_id = self.shop_id_var.get().strip() or DEFAULT_SHOP_ID
+        shop_id = form.shop_id.strip() or DEFAULT_SHOP_ID
 
         global_timeout_ms: Optional[int]
-        if self.global_timeout_var.get().strip():
+        global_timeout_raw = form.global_timeout.strip()
+        if global_timeout_raw:
             try:
-                global_timeout_ms = int(self.global_timeout_var.get().strip())
+                global_timeout_ms = int(global_timeout_raw)
             except ValueError as exc:
                 raise ValueError("全局超时需要为整数毫秒。") from exc
         else:
             global_timeout_ms = None
 
-        concurrency = max(1, int(self.concurrency_var.get() or 1))
+        concurrency = max(1, int(form.concurrency or 1))
 
         account = AccountConfig(
-            name=self.account_name_var.get().strip() or "ACCOUNT_PLACEHOLDER",
+            name=form.account_name.strip() or "ACCOUNT_PLACEHOLDER",
             cookie=cookie,
-            preferred_cards=preferred_cards,
+            preferred_cards=form.preferred_cards,
         )
 
         tasks = self._build_tasks(
             title_keywords=title_keywords,
             time_keywords=time_keywords,
             dates=dates,
-            strict_match=strict_match,
-            allow_fallback=allow_fallback,
+            strict_match=form.strict_match,
+            allow_fallback=form.allow_fallback,
             max_attempts=max_attempts,
             delay_ms=(int(delay[0]), int(delay[1])),
         )
@@ -1207,43 +1713,58 @@ class VisualApp(tk.Tk):
             date_rule=None,
             global_timeout_ms=global_timeout_ms,
             concurrency=concurrency,
-            log_json=bool(self.log_json_var.get()),
+            log_json=form.log_json,
         )
         return config
 
     def _on_run_clicked(self) -> None:
         if self._is_running:
             return
-        try:
-            config = self._build_config()
-        except ValueError as exc:
-            messagebox.showerror("配置错误", str(exc), parent=self)
-            return
+        form = self._snapshot_form()
 
         self._is_running = True
+        self._idle_status = str(self.status_chip.cget("text"))
         self.run_button.state(["disabled"])
         self.status_chip.configure(text="正在执行...")
-        self._append_log("\n=== 开始执行预约任务 ===\n")
         self._show_busy()
         self._current_run_started = dt.datetime.now()
 
         thread = threading.Thread(
             target=self._run_worker,
-            args=(config, self._current_run_started),
+            args=(form, self._current_run_started),
             daemon=True,
         )
         thread.start()
 
-    def _run_worker(self, config: AppConfig, started_at: dt.datetime) -> None:
+    def _on_config_error(self, message: str) -> None:
+        self._is_running = False
+        self.run_button.state(["!disabled"])
+        self._hide_busy()
+        self.status_chip.configure(text=self._idle_status)
+        messagebox.showerror("配置错误", message, parent=self)
+
+    def _run_worker(self, form: _FormSnapshot, started_at: dt.datetime) -> None:
+        # runner 会连带导入 requests 与 HTML 解析依赖，首次运行时才导入
+        from runner import run_tasks
+
+        # 日期、延迟等解析放在工作线程中完成，避免阻塞界面
+        try:
+            config = self._build_config_from_snapshot(form)
+        except ValueError as exc:
+            self.after(0, self._on_config_error, str(exc))
+            return
+        self.log_queue.append(("log", "\n=== 开始执行预约任务 ===\n"))
         writer = QueueWriter(self.log_queue)
-        old_stdout, old_stderr = sys.stdout, sys.stderr
-        sys.stdout = sys.stderr = writer
+        # 只把本线程的输出接入日志，其他线程的输出不受影响
         try:
-            records = run_tasks(config)
+            with _route_output(writer):
+                records = run_tasks(config)
         except Exception as exc:  # pragma: no cover - runtime safety
-            self.log_queue.put(("log", f"[异常] {exc}\n"))
-            self.log_queue.put(("done", (False, "执行失败，请查看日志")))
+            writer.flush()
+            self.log_queue.append(("log", f"[异常] {exc}\n"))
+            self.after(0, self._on_worker_done, False, "执行失败，请查看日志")
         else:
+            writer.flush()
             success, message = self._summarise_records(records)
             finished_at = dt.datetime.now()
             duration = (finished_at - started_at).total_seconds()
@@ -1259,10 +1780,8 @@ class VisualApp(tk.Tk):
                     }
                 ),
             }
-            self.log_queue.put(("history", history_payload))
-            self.log_queue.put(("done", (success, message)))
-        finally:
-            sys.stdout, sys.stderr = old_stdout, old_stderr
+            self.log_queue.append(("history", history_payload))
+            self.after(0, self._on_worker_done, success, message)
 
     def _summarise_records(
         self, records: Sequence[TaskExecutionRecord]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import re
 from typing import Any, Dict, Iterable, Mapping
@@ -13,17 +14,28 @@ _SENSITIVE_KEY_PATTERN = re.compile(
 _TEXT_PATTERNS = [
     (re.compile(r"https?://[^\s'\"<>]+"), "<REDACTED_URL>"),
     (re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"), "<REDACTED_EMAIL>"),
-    (re.compile(r"(?i)shop_id\s*[:=]\s*[^\s,;]+"), "shop_id: <REDACTED>"),
-    (re.compile(r"(?i)(cookie|set-cookie)\s*:?[^\n]*"), "<REDACTED_COOKIE>"),
-    (re.compile(r"(?i)(token|access_token|auth)[=:][^\s&;]+"), "<REDACTED_TOKEN>"),
+    (re.compile(r"(?i:shop_id\s*[:=]\s*[^\s,;]+)"), "shop_id: <REDACTED>"),
+    (re.compile(r"(?i:(cookie|set-cookie)\s*:?[^\n]*)"), "<REDACTED_COOKIE>"),
+    (re.compile(r"(?i:(token|access_token|auth)[=:][^\s&;]+)"), "<REDACTED_TOKEN>"),
 ]
+# 所有文本规则合并成一个分支模式，干净文本只需扫描一遍即可跳过
+_ANY_TEXT_PATTERN = re.compile("|".join(f"(?:{pattern.pattern})" for pattern, _ in _TEXT_PATTERNS))
+
+
+# 超过该长度的文本直接脱敏，不进入缓存
+_CACHE_MAX_TEXT_LEN = 1024
 
 
 def mask_identifier(value: str | None, *, placeholder: str = "<REDACTED>") -> str:
     """Return a stable masked representation for identifiers such as shop_id."""
     if not value:
         return placeholder
-    clean = re.sub(r"[^A-Za-z0-9]", "", str(value))
+    return _mask_identifier_cached(str(value), placeholder)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mask_identifier_cached(value: str, placeholder: str) -> str:
+    clean = re.sub(r"[^A-Za-z0-9]", "", value)
     if not clean:
         return placeholder
     suffix = f"{abs(hash(clean)) & 0xFFFF:04x}"
@@ -35,11 +47,24 @@ def sanitize_text(value: str | None) -> str:
     if value is None:
         return ""
     text = str(value)
+    if len(text) > _CACHE_MAX_TEXT_LEN:
+        return _apply_text_patterns(text)
+    return _sanitize_text_cached(text)
+
+
+def _apply_text_patterns(text: str) -> str:
+    # 多数日志行不含敏感信息，一次扫描即可返回；命中时仍按顺序逐条替换，
+    # 因为前面的替换结果会影响后续匹配（如邮箱紧接 URL 的情况）
+    if not _ANY_TEXT_PATTERN.search(text):
+        return text
     for pattern, replacement in _TEXT_PATTERNS:
         text = pattern.sub(replacement, text)
     return text
 
 
+_sanitize_text_cached = functools.lru_cache(maxsize=4096)(_apply_text_patterns)
+
+
 def _sanitize_sequence(data: Iterable[Any]) -> list[Any]:
     return [sanitize_payload(item) for item in data]
 